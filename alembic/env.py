@@ -16,7 +16,7 @@ from app.config import settings
 from app.database import Base
 
 # ✅ Importer TOUS les modèles pour que Alembic les détecte
-from app.database import User, Prediction
+from app.database import User, Prediction, ShadowPrediction, UserPredictionCounter, RefreshToken, ApiKey, RevokedToken
 
 # Configuration Alembic
 config = context.config
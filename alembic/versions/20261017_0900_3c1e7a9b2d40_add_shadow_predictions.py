@@ -0,0 +1,40 @@
+"""Add shadow_predictions
+
+Revision ID: 3c1e7a9b2d40
+Revises: 9a5f149c892e
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e7a9b2d40'
+down_revision: Union[str, None] = '9a5f149c892e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('shadow_predictions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('prediction_id', sa.Integer(), nullable=True),
+    sa.Column('champion_version', sa.String(), nullable=False),
+    sa.Column('challenger_version', sa.String(), nullable=False),
+    sa.Column('champion_probability', sa.Float(), nullable=False),
+    sa.Column('probability', sa.Float(), nullable=False),
+    sa.Column('agrees', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_shadow_predictions_prediction_id'), 'shadow_predictions', ['prediction_id'], unique=False)
+    op.create_index('idx_shadow_challenger_created', 'shadow_predictions', ['challenger_version', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_shadow_challenger_created', table_name='shadow_predictions')
+    op.drop_index(op.f('ix_shadow_predictions_prediction_id'), table_name='shadow_predictions')
+    op.drop_table('shadow_predictions')
@@ -0,0 +1,44 @@
+"""Add user_prediction_counters
+
+Revision ID: 5b8d2f6e1a93
+Revises: 3c1e7a9b2d40
+Create Date: 2026-10-17 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2f6e1a93'
+down_revision: Union[str, None] = '3c1e7a9b2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_prediction_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('approved', sa.Integer(), nullable=False),
+    sa.Column('rejected', sa.Integer(), nullable=False),
+    sa.Column('last_prediction_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Amorçage depuis l'historique existant
+    op.execute(
+        "INSERT INTO user_prediction_counters "
+        "(user_id, total, approved, rejected, last_prediction_at) "
+        "SELECT user_id, count(id), "
+        "count(CASE WHEN decision = 'APPROVED' THEN 1 END), "
+        "count(CASE WHEN decision = 'REJECTED' THEN 1 END), "
+        "max(created_at) "
+        "FROM predictions GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_prediction_counters')
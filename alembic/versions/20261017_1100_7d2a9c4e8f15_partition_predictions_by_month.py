@@ -0,0 +1,129 @@
+"""Partition predictions by month on created_at
+
+Revision ID: 7d2a9c4e8f15
+Revises: 5b8d2f6e1a93
+Create Date: 2026-10-17 11:00:00.000000+00:00
+
+PostgreSQL uniquement : `predictions` devient une table partitionnée par
+plage (RANGE) sur created_at, une partition par mois, plus une partition
+DEFAULT. La clé primaire devient (id, created_at) (la clé de partition doit
+en faire partie) ; la séquence des ids est conservée, le modèle ORM ne
+change pas. Les partitions suivantes sont créées par app/partitions.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a9c4e8f15'
+down_revision: Union[str, None] = '5b8d2f6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, user_id, age, income, credit_amount, duration, decision, "
+    "probability, model_version, created_at, ip_address"
+)
+# Mois créés d'avance au-delà du mois courant
+MONTHS_AHEAD = 3
+
+
+def _rename_legacy() -> None:
+    op.execute("ALTER TABLE predictions RENAME TO predictions_legacy")
+    op.execute("ALTER TABLE predictions_legacy RENAME CONSTRAINT predictions_pkey TO predictions_legacy_pkey")
+    op.execute("ALTER INDEX IF EXISTS ix_predictions_id RENAME TO ix_predictions_legacy_id")
+    op.execute("ALTER INDEX IF EXISTS idx_user_created RENAME TO idx_user_created_legacy")
+
+
+def _create_indexes() -> None:
+    op.execute("CREATE INDEX ix_predictions_id ON predictions (id)")
+    op.execute("CREATE INDEX idx_user_created ON predictions (user_id, created_at)")
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    _rename_legacy()
+    op.execute(f"""
+        CREATE TABLE predictions (
+            id INTEGER NOT NULL DEFAULT nextval('predictions_id_seq'::regclass),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            age INTEGER NOT NULL,
+            income DOUBLE PRECISION NOT NULL,
+            credit_amount DOUBLE PRECISION NOT NULL,
+            duration INTEGER NOT NULL,
+            decision VARCHAR NOT NULL,
+            probability DOUBLE PRECISION NOT NULL,
+            model_version VARCHAR NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+                DEFAULT (now() AT TIME ZONE 'utc'),
+            ip_address VARCHAR,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY predictions.id")
+    op.execute("CREATE TABLE predictions_default PARTITION OF predictions DEFAULT")
+
+    # Une partition par mois, du plus ancien historique à MONTHS_AHEAD mois
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month DATE;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(
+                        (SELECT min(created_at) FROM predictions_legacy),
+                        now() AT TIME ZONE 'utc')),
+                    date_trunc('month', now() AT TIME ZONE 'utc')
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month')::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF predictions FOR VALUES FROM (%L) TO (%L)',
+                    'predictions_' || to_char(month, '"y"YYYY"m"MM'),
+                    month, (month + interval '1 month')::date);
+            END LOOP;
+        END
+        $$
+    """)
+
+    op.execute(f"""
+        INSERT INTO predictions ({COLUMNS})
+        SELECT id, user_id, age, income, credit_amount, duration, decision,
+               probability, model_version,
+               coalesce(created_at, now() AT TIME ZONE 'utc'), ip_address
+        FROM predictions_legacy
+    """)
+    op.execute("DROP TABLE predictions_legacy")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    # Les partitions détachées par la rétention ne sont pas réintégrées
+    _rename_legacy()
+    op.execute("""
+        CREATE TABLE predictions (
+            id INTEGER NOT NULL DEFAULT nextval('predictions_id_seq'::regclass),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            age INTEGER NOT NULL,
+            income DOUBLE PRECISION NOT NULL,
+            credit_amount DOUBLE PRECISION NOT NULL,
+            duration INTEGER NOT NULL,
+            decision VARCHAR NOT NULL,
+            probability DOUBLE PRECISION NOT NULL,
+            model_version VARCHAR NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            ip_address VARCHAR,
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY predictions.id")
+    op.execute(f"INSERT INTO predictions ({COLUMNS}) SELECT {COLUMNS} FROM predictions_legacy")
+    op.execute("DROP TABLE predictions_legacy CASCADE")
+    _create_indexes()
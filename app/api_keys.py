@@ -0,0 +1,93 @@
+"""
+Clés d'API des clients machine (en-tête X-API-Key)
+
+Format : csk_<préfixe>_<secret>. Le préfixe (indexé, unique) retrouve la
+ligne en une lecture ; la base ne stocke qu'un HMAC-SHA256 de la clé
+complète (calcul de l'ordre de la microseconde, pas de bcrypt : le secret
+a 256 bits d'entropie). Les principals résolus sont mis en cache sous le
+HMAC avec un TTL court (API_KEY_CACHE_TTL_SECONDS) : une révocation faite
+sur un autre worker y est vue en quelques secondes.
+"""
+import hashlib
+import hmac
+import secrets
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import ApiKey, User
+from app.principals import Principal
+
+KEY_PREFIX = "csk"
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """(clé complète à remettre au client, préfixe public)"""
+    prefix = secrets.token_hex(6)
+    return f"{KEY_PREFIX}_{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def hash_api_key(key: str) -> str:
+    secret = (settings.API_KEY_HASH_SECRET or settings.SECRET_KEY).encode()
+    return hmac.new(secret, key.encode(), hashlib.sha256).hexdigest()
+
+
+def parse_prefix(key: str) -> Optional[str]:
+    parts = key.split("_", 2)
+    if len(parts) != 3 or parts[0] != KEY_PREFIX or not parts[1]:
+        return None
+    return parts[1]
+
+
+def cache_key(key_hash: str) -> str:
+    """Clé du cache des principals (jamais en collision avec un username JWT)"""
+    return f"apikey:{key_hash}"
+
+
+async def resolve_api_key(db: AsyncSession, key: str) -> Optional[Principal]:
+    """Principal du propriétaire d'une clé valide et non révoquée, sinon None"""
+    prefix = parse_prefix(key)
+    if prefix is None:
+        return None
+    row = (await db.execute(
+        select(ApiKey, User).join(User, User.id == ApiKey.user_id)
+        .where(ApiKey.prefix == prefix)
+    )).first()
+    if row is None:
+        return None
+    api_key, user = row
+    if api_key.revoked_at is not None or not hmac.compare_digest(api_key.key_hash,
+                                                                  hash_api_key(key)):
+        return None
+    return Principal.from_user(user)
+
+
+# ==================== Gestion (routes admin, session synchrone) ====================
+
+def create_api_key(db: Session, user_id: int, name: str) -> Tuple[str, ApiKey]:
+    key, prefix = generate_api_key()
+    row = ApiKey(user_id=user_id, name=name, prefix=prefix, key_hash=hash_api_key(key))
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    return key, row
+
+
+def list_api_keys(db: Session, user_id: int) -> List[ApiKey]:
+    return db.scalars(
+        select(ApiKey).where(ApiKey.user_id == user_id).order_by(ApiKey.id)
+    ).all()
+
+
+def revoke_api_key(db: Session, key_id: int) -> Optional[ApiKey]:
+    row = db.get(ApiKey, key_id)
+    if row is None:
+        return None
+    if row.revoked_at is None:
+        row.revoked_at = datetime.utcnow()
+        db.commit()
+    return row
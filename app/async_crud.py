@@ -0,0 +1,139 @@
+"""
+Versions asyncio des opérations de app/crud.py (AsyncSession)
+"""
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.counters import bump_counters_stmt, counter_deltas, counter_stats, prediction_rows
+from app.database import User, Prediction, UserPredictionCounter
+from app.models import UserCreate
+from app.pagination import Cursor
+from app.hashing import password_hasher
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.get(User, user_id)
+
+
+async def create_user(
+    db: AsyncSession,
+    user: UserCreate,
+    is_admin: bool = False
+) -> User:
+    # bcrypt est coûteux en CPU : pool dédié et borné, hors de la boucle asyncio
+    hashed_password = await password_hasher.hash(user.password)
+
+    db_user = User(
+        email=user.email,
+        username=user.username,
+        hashed_password=hashed_password,
+        full_name=user.full_name,
+        is_admin=is_admin,
+    )
+
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+async def _bump_counters(db: AsyncSession, predictions: List[Prediction]) -> None:
+    """Voir counters.bump_counters (même transaction que l'INSERT)"""
+    deltas = counter_deltas(prediction_rows(predictions))
+    await db.execute(bump_counters_stmt(db.get_bind().dialect.name, deltas))
+
+
+async def create_prediction(
+    db: AsyncSession,
+    user_id: int,
+    age: int,
+    income: float,
+    credit_amount: float,
+    duration: int,
+    decision: str,
+    probability: float,
+    model_version: str,
+    ip_address: Optional[str] = None
+) -> Prediction:
+    db_prediction = Prediction(
+        user_id=user_id,
+        age=age,
+        income=income,
+        credit_amount=credit_amount,
+        duration=duration,
+        decision=decision,
+        probability=probability,
+        model_version=model_version,
+        ip_address=ip_address
+    )
+    db.add(db_prediction)
+    await db.flush()
+    await _bump_counters(db, [db_prediction])
+    # expire_on_commit=False : l'id lu au flush reste valable, pas de refresh()
+    await db.commit()
+    return db_prediction
+
+async def create_predictions_bulk(
+    db: AsyncSession,
+    user_id: int,
+    rows: List[dict],
+    model_version: str,
+    ip_address: Optional[str] = None
+) -> List[int]:
+    """Voir crud.create_predictions_bulk"""
+    db_predictions = [
+        Prediction(
+            user_id=user_id,
+            model_version=model_version,
+            ip_address=ip_address,
+            **row
+        )
+        for row in rows
+    ]
+    db.add_all(db_predictions)
+    await db.flush()
+    ids = [p.id for p in db_predictions]
+    await _bump_counters(db, db_predictions)
+    await db.commit()
+    return ids
+
+async def get_user_predictions(db: AsyncSession, user_id: int, skip: int = 0,
+                               limit: int = 100, cursor: Optional[Cursor] = None):
+    """
+    Historique du plus récent au plus ancien, trié sur (created_at, id)
+
+    Avec `cursor`, lecture par clé (keyset) : les lignes strictement après la
+    position du curseur, sans OFFSET ; `skip` est alors ignoré.
+    """
+    query = select(Prediction).where(Prediction.user_id == user_id)
+    if cursor is not None:
+        # created_at <= borne : plage sur idx_user_created ; l'id départage
+        # les prédictions de même horodatage
+        query = query.where(
+            Prediction.created_at <= cursor.created_at,
+            or_(Prediction.created_at < cursor.created_at, Prediction.id < cursor.id),
+        )
+    else:
+        query = query.offset(skip)
+    result = await db.execute(
+        query.order_by(Prediction.created_at.desc(), Prediction.id.desc()).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_user_prediction_stats(db: AsyncSession, user_id: int) -> dict:
+    """
+    Statistiques des prédictions pour un utilisateur donné (lecture par clé
+    primaire de user_prediction_counters)
+    """
+    return counter_stats(await db.get(UserPredictionCounter, user_id))
@@ -1,34 +1,31 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, Security, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 
 
-from app import crud, models, schemas,database
+from app import api_keys, async_crud, models, schemas,database
+from app.revocation import ACCESS_TOKEN_LIFETIME, revocation_list
 from app.config import settings
+from app.principals import Principal, principal_cache
+# Hachage : implémentation unique (app/security.py, contexte de app/hashing.py)
+from app.security import get_password_hash, verify_password
 
 # ================== CONFIG ==================
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# ================== PASSWORD ==================
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# Variante tolérante : une requête peut s'authentifier par X-API-Key à la place
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 # ================== JWT ==================
 
@@ -37,8 +34,9 @@ def create_access_token(
     expires_delta: Optional[timedelta] = None
 ) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    expire = datetime.utcnow() + (expires_delta or ACCESS_TOKEN_LIFETIME)
+    # jti : identifiant propre au token, cible de /auth/logout et des révocations
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_access_token(token: str) -> dict:
@@ -52,25 +50,66 @@ def decode_access_token(token: str) -> dict:
 
 # ================== DEPENDANCES ==================
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> database.User:
+async def get_api_key_user(
+    api_key: Optional[str] = Security(api_key_header),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[Principal]:
+    """
+    Propriétaire de la clé X-API-Key (None sans en-tête) ; un HMAC puis une
+    lecture par préfixe en cas de miss, mis en cache API_KEY_CACHE_TTL_SECONDS
+    """
+    if not api_key:
+        return None
+    subject = api_keys.cache_key(api_keys.hash_api_key(api_key))
+    principal = principal_cache.get(subject)
+    if principal is None:
+        principal = await api_keys.resolve_api_key(db, api_key)
+        if principal is None:
+            raise HTTPException(status_code=401, detail="Clé d'API invalide ou révoquée")
+        principal_cache.put(subject, principal, ttl=settings.API_KEY_CACHE_TTL_SECONDS)
+    return principal
+
+async def get_current_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    api_key_user: Optional[Principal] = Depends(get_api_key_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Utilisateur de la clé d'API ou du token, depuis le cache des principals
+    si possible (la session n'ouvre une connexion qu'en cas de miss)
+    """
+    if api_key_user is not None:
+        return api_key_user
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     payload = decode_access_token(token)
     username: str | None = payload.get("sub")
 
     if username is None:
         raise HTTPException(status_code=401, detail="Token invalide")
 
-    user = crud.get_user_by_username(db, username)
-    if not user:
-        raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+    # Test en mémoire ; lecture de revoked_tokens seulement si le filtre répond peut-être
+    if await revocation_list.is_revoked(db, [payload.get("jti"), payload.get("fam")]):
+        raise HTTPException(status_code=401, detail="Token révoqué")
+
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await async_crud.get_user_by_username(db, username)
+        if not user:
+            raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+        principal = Principal.from_user(user)
+        principal_cache.put(username, principal)
 
-    return user
+    return principal
 
-def get_current_active_user(
-    current_user: database.User = Depends(get_current_user),
-) -> database.User:
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=403, detail="Compte désactivé")
     return current_user
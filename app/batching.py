@@ -0,0 +1,157 @@
+"""
+Micro-batching des prédictions : regroupe les appels concurrents
+en un seul predict_proba
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence, Set
+
+from app.config import settings
+from app.executor import inference_executor
+from app.metrics import Histogram
+from app.predictor import Score
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_DELAY_US_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+
+
+class MicroBatcher:
+    """
+    Ordonnanceur de micro-batchs
+
+    Les demandes arrivant pendant une fenêtre de `max_wait_us` microsecondes
+    sont regroupées (au plus `max_batch_size`) et évaluées en un seul appel ;
+    chaque appelant récupère son résultat via son propre future. Un batch en
+    cours d'évaluation n'empêche pas la constitution du suivant.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[
+            [Sequence[Sequence[float]]], Awaitable[List[Score]]
+        ],
+        max_wait_us: int,
+        max_batch_size: int,
+    ):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait_us / 1_000_000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._pending: List[tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_delay_us = Histogram(QUEUE_DELAY_US_BUCKETS)
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Démarre la boucle d'ordonnancement (dans la boucle asyncio courante)"""
+        if self.is_running():
+            return
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "✅ Micro-batching actif (fenêtre=%sµs, taille max=%s)",
+            int(self.max_wait * 1_000_000), self.max_batch_size
+        )
+
+    async def stop(self) -> None:
+        if not self.is_running():
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batching arrêté"))
+        self._pending.clear()
+
+    async def submit(
+        self,
+        age: int,
+        income: float,
+        credit_amount: float,
+        duration: int
+    ) -> Score:
+        """Ajoute une demande au prochain batch et attend son résultat"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            ((age, income, credit_amount, duration), future, time.perf_counter())
+        )
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Fenêtre d'attente, écourtée dès que le batch est plein
+            if len(self._pending) < self.max_batch_size and self.max_wait > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        now = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued_at in batch:
+            self.queue_delay_us.observe((now - enqueued_at) * 1_000_000)
+
+        try:
+            results = await self.predict_fn([row for row, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_metrics(self) -> dict:
+        """Distribution des tailles de batch et du délai de mise en file"""
+        return {
+            "enabled": self.is_running(),
+            "max_wait_us": int(self.max_wait * 1_000_000),
+            "max_batch_size": self.max_batch_size,
+            "pending": len(self._pending),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_delay_us": self.queue_delay_us.snapshot(),
+        }
+
+
+# Singleton global, démarré au startup si MICRO_BATCHING_ENABLED
+batcher = MicroBatcher(
+    predict_fn=inference_executor.predict_batch,
+    max_wait_us=settings.MICRO_BATCH_MAX_WAIT_US,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+)
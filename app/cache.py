@@ -0,0 +1,142 @@
+"""
+Cache en mémoire des prédictions (LRU + TTL), par worker
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.predictor import Score
+
+FeatureKey = Tuple[int, float, float, int]
+
+
+def normalize_features(
+    age: int,
+    income: float,
+    credit_amount: float,
+    duration: int
+) -> FeatureKey:
+    """
+    Clé canonique : 3200 et 3200.0 donnent la même entrée ; les valeurs ne
+    sont pas arrondies (deux entrées distinctes ne partagent jamais un score)
+    """
+    return (int(age), float(income), float(credit_amount), int(duration))
+
+
+class PredictionCache:
+    """
+    Cache LRU borné en taille, avec expiration (TTL)
+
+    Clé : (features normalisées, version du modèle). Le cache est vidé dès
+    qu'une autre version du modèle est observée ; les calculs identiques
+    concurrents sont fusionnés (un seul calcul, les autres attendent). Le
+    calcul tourne dans sa propre tâche : l'annulation de la requête qui l'a
+    lancé n'atteint pas les autres.
+    S'utilise depuis la boucle asyncio uniquement (pas de verrou).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[Score, float]]" = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: tuple) -> Optional[Score]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        score, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return score
+
+    def put(self, key: tuple, score: Score) -> None:
+        self._entries[key] = (score, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_compute(
+        self,
+        features: FeatureKey,
+        version: str,
+        compute: Callable[[], Awaitable[Score]],
+    ) -> Score:
+        """Retourne le score en cache, ou le calcule une seule fois pour tous"""
+        self._check_version(version)
+        key = (features, version)
+
+        score = self.get(key)
+        if score is not None:
+            self.hits += 1
+            return score
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._settle(key, features, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: tuple, features: FeatureKey, task: asyncio.Future) -> None:
+        """Fin du calcul (même si la requête qui l'a lancé a été annulée)"""
+        del self._in_flight[key]
+        # Exception consommée si personne n'attendait plus ce calcul
+        if task.cancelled() or task.exception() is not None:
+            return
+        score = task.result()
+        # La version qui a réellement évalué fait foi (reload en cours)
+        if score.model_version == self._version:
+            self.put((features, score.model_version), score)
+
+    def get_metrics(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": settings.PREDICTION_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "model_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton global (un cache par worker)
+prediction_cache = PredictionCache(
+    max_size=settings.PREDICTION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+)
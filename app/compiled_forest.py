@@ -0,0 +1,133 @@
+"""
+Évaluateur "compilé" d'une forêt d'arbres sklearn : tous les arbres sont
+aplatis une fois pour toutes dans des tableaux NumPy contigus
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+
+TREE_LEAF = -1
+
+
+class CompiledForest:
+    """
+    Forêt aplatie : feature, threshold, left, right, value
+
+    Les nœuds de tous les arbres sont concaténés ; les enfants sont des
+    indices absolus et chaque feuille boucle sur elle-même, si bien que
+    `max_depth` pas d'indexation vectorisée amènent toutes les lignes
+    dans leurs feuilles, pour tous les arbres à la fois.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = None
+
+    @classmethod
+    def from_estimator(cls, model) -> "CompiledForest":
+        """Aplatit un RandomForestClassifier / ExtraTreesClassifier entraîné"""
+        if not hasattr(model, "estimators_"):
+            raise TypeError(
+                f"Modèle non compilable : {type(model).__name__} (forêt sklearn attendue)"
+            )
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n)
+            leaf = tree.children_left == TREE_LEAF
+
+            # Feuilles : auto-boucle, feature 0 (valeur ignorée)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            lefts.append(np.where(leaf, ids, tree.children_left) + offset)
+            rights.append(np.where(leaf, ids, tree.children_right) + offset)
+
+            # Probabilités par feuille, normalisées comme predict_proba d'un arbre
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            values.append(counts / totals)
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        compiled = cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+        )
+        compiled.n_features_in_ = getattr(model, "n_features_in_", None)
+        return compiled
+
+    def save(self, path: Path) -> None:
+        """
+        Écrit la forêt dans un artefact joblib non compressé, mappable
+        en mémoire (écriture atomique : fichier temporaire puis rename)
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        joblib.dump(self, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: Optional[str] = "r") -> "CompiledForest":
+        """
+        Charge un artefact écrit par save() ; avec mmap_mode, les tableaux
+        restent dans le cache de pages et sont partagés entre processus
+        """
+        compiled = joblib.load(path, mmap_mode=mmap_mode)
+        if not isinstance(compiled, cls):
+            raise TypeError(f"Artefact invalide : {path}")
+        return compiled
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Équivalent de RandomForestClassifier.predict_proba"""
+        # sklearn compare des features float32 à des seuils float64
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -15,11 +15,34 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql://credit_user:credit_password@db:5432/credit_scoring_db"
+    # Par défaut dérivée de DATABASE_URL (driver asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Pool de connexions (par moteur et par worker) ; recycle -1 = jamais
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    # Réplicas en lecture (JSON : ["postgresql://...", ...]) ; un réplica en
+    # retard de plus de REPLICA_MAX_LAG_SECONDS est écarté au profit du primaire
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Durée de vie des access tokens ; borne aussi la conservation des révocations
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # Refresh tokens opaques, à rotation (/auth/refresh)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Clés d'API (X-API-Key) : secret du HMAC (SECRET_KEY par défaut) et
+    # délai maximal avant qu'une révocation soit vue par tous les workers
+    API_KEY_HASH_SECRET: Optional[str] = None
+    API_KEY_CACHE_TTL_SECONDS: float = 5.0
+    # Révocation des access tokens : filtre de Bloom par worker, reconstruit
+    # depuis revoked_tokens à cet intervalle (délai de propagation entre workers)
+    REVOCATION_REFRESH_INTERVAL_SECONDS: float = 5.0
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
     
     # API
     API_TITLE: str = "Credit Scoring API"
@@ -27,6 +50,14 @@ class Settings(BaseSettings):
     API_ENV: str = "development"
     DEBUG: bool = True
     
+    # Logging (voir app/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" ou "json"
+    # Niveaux par logger ; "sqlalchemy.engine": "INFO" trace chaque requête SQL
+    LOG_LEVELS: dict = {"sqlalchemy.engine": "WARNING"}
+    # Taux d'échantillonnage (0-1) des records < WARNING, par préfixe de logger
+    LOG_SAMPLING: dict = {}
+    
     # Model
     MODEL_CONFIG: dict = {
         "name": "Credit Scoring AutoML",
@@ -36,6 +67,83 @@ class Settings(BaseSettings):
         "threshold": 0.5,
     }
     
+    # Registre de modèles versionnés (ignoré si le manifest est absent)
+    MODEL_REGISTRY_DIR: Path = BASE_DIR / "models" / "registry"
+    MODEL_WATCH_INTERVAL_SECONDS: float = 5.0
+    
+    # Shadow scoring : versions du registre évaluées en arrière-plan
+    SHADOW_CHALLENGERS: list[str] = []
+    SHADOW_QUEUE_SIZE: int = 10000
+    SHADOW_BATCH_SIZE: int = 256
+    SHADOW_FLUSH_INTERVAL_SECONDS: float = 1.0
+    
+    # Backend d'inférence : "sklearn" ou "compiled" (forêt aplatie en NumPy)
+    INFERENCE_BACKEND: str = "sklearn"
+    # Chargement : "private" (joblib.load classique) ou "mmap" (forêt compilée
+    # mappée en mémoire, pages partagées entre workers ; backend compiled requis)
+    MODEL_LOAD_MODE: str = "private"
+    MODEL_MMAP_PATH: Optional[Path] = None
+    
+    # Persistance des prédictions : "sync" (commit par requête) ou
+    # "write_behind" (spool local + insertion par lots en arrière-plan)
+    PREDICTION_WRITE_MODE: str = "sync"
+    WRITE_BEHIND_SPOOL_DIR: Path = BASE_DIR / "spool"
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 0.5
+    WRITE_BEHIND_MAX_BATCH: int = 1000
+    WRITE_BEHIND_ID_BLOCK_SIZE: int = 500
+    WRITE_BEHIND_FSYNC: bool = False
+    # Lignes par fichier de spool avant d'en ouvrir un nouveau
+    WRITE_BEHIND_SEGMENT_MAX_ROWS: int = 100000
+    
+    # Prédictions batch
+    BATCH_MAX_SIZE: int = 1000
+
+    # Taille maximale d'une page de /predictions/history (limit est plafonné)
+    HISTORY_MAX_PAGE_SIZE: int = 500
+    ADMIN_USERS_MAX_PAGE_SIZE: int = 1000
+    # /admin/stats : instantané rafraîchi en arrière-plan au-delà du TTL ;
+    # APPROXIMATE lit pg_class.reltuples au lieu de COUNT(*)
+    ADMIN_STATS_TTL_SECONDS: float = 30.0
+    ADMIN_STATS_APPROXIMATE: bool = False
+    # Lignes lues par aller-retour (et par groupe Parquet) pour /admin/export
+    EXPORT_CHUNK_SIZE: int = 10000
+
+    # Partitions mensuelles de predictions (PostgreSQL, après migration) ;
+    # rétention appliquée par `python manage.py prune-partitions`, 0 = illimitée
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 6 * 3600
+    PREDICTION_RETENTION_MONTHS: int = 0
+    PARTITION_RETENTION_MODE: str = "detach"  # ou "drop"
+    
+    # Budget de threads d'inférence par worker (n_jobs du modèle, BLAS, OpenMP) ;
+    # 0 pour garder les réglages de l'entraînement
+    INFERENCE_THREAD_BUDGET: int = 1
+    
+    # Exécuteur d'inférence : "thread" ou "process"
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_MAX_WORKERS: int = 2
+    INFERENCE_MAX_QUEUE: int = 32
+    
+    # Cache des prédictions (par worker)
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 300.0
+
+    # Cache des utilisateurs authentifiés (par worker) ; le TTL borne le délai
+    # avant qu'une désactivation faite sur un autre worker soit vue
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Pool bcrypt dédié (login / register) ; file pleine → 503 immédiat
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    
+    # Micro-batching (opt-in) des prédictions unitaires
+    MICRO_BATCHING_ENABLED: bool = False
+    MICRO_BATCH_MAX_WAIT_US: int = 1000
+    MICRO_BATCH_MAX_SIZE: int = 64
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
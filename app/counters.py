@@ -0,0 +1,111 @@
+"""
+Compteurs de prédictions par utilisateur (table user_prediction_counters)
+
+Chaque écriture de prédictions applique un UPSERT d'incréments dans la même
+transaction ; /predictions/stats devient une lecture par clé primaire.
+`rebuild_counters` recalcule tout depuis `predictions` pour corriger une
+éventuelle dérive (python manage.py rebuild-counters).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import Prediction, UserPredictionCounter
+
+COUNTER_FIELDS = ("total", "approved", "rejected")
+
+
+def dialect_insert(dialect: str, model):
+    """INSERT propre au dialecte (supporte ON CONFLICT)"""
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise RuntimeError(f"UPSERT non supporté pour {dialect}")
+
+
+def counter_deltas(rows: Iterable[dict]) -> List[dict]:
+    """Agrège des lignes de prédiction en incréments par utilisateur"""
+    deltas: Dict[int, dict] = defaultdict(
+        lambda: {"total": 0, "approved": 0, "rejected": 0, "last_prediction_at": None}
+    )
+    for row in rows:
+        delta = deltas[row["user_id"]]
+        delta["total"] += 1
+        if row["decision"] == "APPROVED":
+            delta["approved"] += 1
+        elif row["decision"] == "REJECTED":
+            delta["rejected"] += 1
+        created_at = row.get("created_at") or datetime.utcnow()
+        if delta["last_prediction_at"] is None or created_at > delta["last_prediction_at"]:
+            delta["last_prediction_at"] = created_at
+    return [dict(delta, user_id=user_id) for user_id, delta in deltas.items()]
+
+
+def bump_counters_stmt(dialect: str, deltas: List[dict]):
+    """UPSERT qui ajoute les incréments aux compteurs existants"""
+    stmt = dialect_insert(dialect, UserPredictionCounter).values(deltas)
+    current = UserPredictionCounter.__table__.c
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[current.user_id],
+        set_={
+            **{field: current[field] + excluded[field] for field in COUNTER_FIELDS},
+            "last_prediction_at": case(
+                (or_(current.last_prediction_at.is_(None),
+                     current.last_prediction_at < excluded.last_prediction_at),
+                 excluded.last_prediction_at),
+                else_=current.last_prediction_at,
+            ),
+        },
+    )
+
+
+def bump_counters(bind, rows: Iterable[dict]) -> None:
+    """Applique les incréments de `rows` (Connection ou Session synchrone)"""
+    deltas = counter_deltas(rows)
+    if deltas:
+        dialect = bind.dialect if hasattr(bind, "dialect") else bind.get_bind().dialect
+        bind.execute(bump_counters_stmt(dialect.name, deltas))
+
+
+def prediction_rows(predictions) -> List[dict]:
+    """Objets Prediction (après flush) → lignes pour counter_deltas"""
+    return [
+        {"user_id": p.user_id, "decision": p.decision, "created_at": p.created_at}
+        for p in predictions
+    ]
+
+
+def counter_stats(counter: Optional[UserPredictionCounter]) -> dict:
+    """Format de réponse de /predictions/stats"""
+    total = counter.total if counter else 0
+    approved = counter.approved if counter else 0
+    return {
+        "total_predictions": total,
+        "approved": approved,
+        "rejected": counter.rejected if counter else 0,
+        "approval_rate": round(approved / total, 3) if total > 0 else 0.0,
+        "last_prediction_at": counter.last_prediction_at if counter else None,
+    }
+
+
+def rebuild_counters(conn) -> int:
+    """Recalcule tous les compteurs depuis la table predictions"""
+    conn.execute(delete(UserPredictionCounter))
+    aggregate = select(
+        Prediction.user_id,
+        func.count(Prediction.id),
+        func.count(case((Prediction.decision == "APPROVED", 1))),
+        func.count(case((Prediction.decision == "REJECTED", 1))),
+        func.max(Prediction.created_at),
+    ).group_by(Prediction.user_id)
+    result = conn.execute(
+        insert(UserPredictionCounter).from_select(
+            ["user_id", "total", "approved", "rejected", "last_prediction_at"], aggregate
+        )
+    )
+    return result.rowcount
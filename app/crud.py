@@ -1,13 +1,15 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import User, Prediction
+from sqlalchemy import select
+from app.database import User, Prediction, UserPredictionCounter
 from app.models import UserCreate
 from sqlalchemy.orm import Session
 
 from app import models
+from app.counters import bump_counters, counter_stats, prediction_rows
 from app.security import get_password_hash
 
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 
 def get_user_by_email(db: Session, email: str) -> User:
@@ -16,6 +18,24 @@ def get_user_by_email(db: Session, email: str) -> User:
 def get_user_by_username(db: Session, username: str) -> User:
     return db.query(User).filter(User.username == username).first()
 
+def update_user_flags(
+    db: Session,
+    user_id: int,
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None
+) -> Optional[User]:
+    """Active / désactive un compte ou change ses droits admin (None = inchangé)"""
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+    if is_active is not None:
+        user.is_active = is_active
+    if is_admin is not None:
+        user.is_admin = is_admin
+    db.commit()
+    db.refresh(user)
+    return user
+
 
 def create_user(
     db: Session,
@@ -71,10 +91,47 @@ def create_prediction(
         ip_address=ip_address
     )
     db.add(db_prediction)
+    db.flush()
+    bump_counters(db, prediction_rows([db_prediction]))
     db.commit()
     db.refresh(db_prediction)
     return db_prediction
 
+def create_predictions_bulk(
+    db: Session,
+    user_id: int,
+    rows: List[dict],
+    model_version: str,
+    ip_address: Optional[str] = None
+) -> List[int]:
+    """
+    Enregistre plusieurs prédictions en un seul INSERT multi-lignes
+
+    Args:
+        rows: dicts avec age, income, credit_amount, duration,
+              decision et probability
+
+    Returns:
+        les ids des prédictions créées, dans l'ordre de `rows`
+    """
+    db_predictions = [
+        Prediction(
+            user_id=user_id,
+            model_version=model_version,
+            ip_address=ip_address,
+            **row
+        )
+        for row in rows
+    ]
+    db.add_all(db_predictions)
+    # flush avant commit : les ids (INSERT ... RETURNING) sont lus une seule
+    # fois, sans le refresh() ligne par ligne qu'imposerait l'expiration
+    db.flush()
+    ids = [p.id for p in db_predictions]
+    bump_counters(db, prediction_rows(db_predictions))
+    db.commit()
+    return ids
+
 def get_user_predictions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     return db.query(Prediction).filter(Prediction.user_id == user_id).order_by(Prediction.created_at.desc()).offset(skip).limit(limit).all()
 
@@ -83,50 +140,36 @@ def get_user_predictions(db: Session, user_id: int, skip: int = 0, limit: int =
 def get_user_prediction_stats(db: Session, user_id: int) -> dict:
     """
     Statistiques des prédictions pour un utilisateur donné
-    """
-
-    # Total des prédictions
-    total = db.query(func.count(Prediction.id)) \
-              .filter(Prediction.user_id == user_id) \
-              .scalar()
-
-    # Nombre de crédits approuvés
-    approved = db.query(func.count(Prediction.id)) \
-                 .filter(
-                     Prediction.user_id == user_id,
-                     Prediction.decision == "APPROVED"
-                 ) \
-                 .scalar()
-
-    # Nombre de crédits rejetés
-    rejected = db.query(func.count(Prediction.id)) \
-                 .filter(
-                     Prediction.user_id == user_id,
-                     Prediction.decision == "REJECTED"
-                 ) \
-                 .scalar()
-
-    approval_rate = (approved / total) if total > 0 else 0.0
-
-    return {
-        "total_predictions": total,
-        "approved": approved,
-        "rejected": rejected,
-        "approval_rate": round(approval_rate, 3),
-    }
-
-def get_all_users(db: Session):
-    return db.query(User).all()
-
-
-
-def get_global_stats(db: Session) -> dict:
-    total_users = db.query(func.count(User.id)).scalar()
-    total_predictions = db.query(func.count(Prediction.id)).scalar()
-
-    return {
-        "total_users": total_users,
-        "total_predictions": total_predictions,
-    }
-
 
+    Lecture par clé primaire des compteurs tenus à jour à chaque INSERT
+    (voir app/counters.py)
+    """
+    return counter_stats(db.get(UserPredictionCounter, user_id))
+
+def users_query(
+    after_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    SELECT des utilisateurs filtrés, triés par id (clé primaire) ;
+    `after_id` reprend après le dernier id déjà lu (keyset)
+    """
+    conditions = []
+    if after_id is not None:
+        conditions.append(User.id > after_id)
+    if is_active is not None:
+        conditions.append(User.is_active == is_active)
+    if is_admin is not None:
+        conditions.append(User.is_admin == is_admin)
+    if created_from is not None:
+        conditions.append(User.created_at >= created_from)
+    if created_to is not None:
+        conditions.append(User.created_at < created_to)
+    return select(User).where(*conditions).order_by(User.id)
+
+def get_users_page(db: Session, limit: int, **filters) -> List[User]:
+    """Une page d'utilisateurs (voir users_query pour les filtres)"""
+    return db.scalars(users_query(**filters).limit(limit)).all()
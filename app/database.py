@@ -1,16 +1,54 @@
 from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from app.config import settings
+from app.pool_metrics import pool_monitors, pool_options
 
+# Driver asyncio correspondant au driver synchrone de DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def make_async_url(url: str) -> str:
+    """postgresql://... → postgresql+asyncpg://..., sqlite://... → sqlite+aiosqlite://..."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de driver asyncio connu pour {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Les requêtes SQL se tracent via LOG_LEVELS["sqlalchemy.engine"] (pas echo=,
+# qui ajouterait un handler synchrone hors du pipeline de logging)
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
     pool_pre_ping=True,
+    **pool_options(settings.DATABASE_URL, pool_monitors["sync"]),
 )
+pool_monitors["sync"].attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Moteur asyncio pour les routes async ; le moteur synchrone reste utilisé
+# par init_bd.py, init_admin.py, Alembic et les threads de fond
+ASYNC_URL = settings.ASYNC_DATABASE_URL or make_async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_URL,
+    pool_pre_ping=True,
+    **pool_options(ASYNC_URL, pool_monitors["async"], asyncio=True),
+)
+pool_monitors["async"].attach(async_engine.sync_engine)
+
+# expire_on_commit=False : pas de rechargement implicite (donc pas d'I/O
+# cachée) en accédant aux attributs après commit
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
 class User(Base):
@@ -48,6 +86,73 @@ class Prediction(Base):
         Index("idx_user_created", "user_id", "created_at"),
     )
 
+class UserPredictionCounter(Base):
+    """
+    Compteurs de prédictions par utilisateur, tenus à jour dans la même
+    transaction que chaque INSERT (voir app/counters.py)
+    """
+    __tablename__ = "user_prediction_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    approved = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    last_prediction_at = Column(DateTime, nullable=True)
+
+class RefreshToken(Base):
+    """
+    Refresh token opaque (seul son SHA-256 est stocké), à usage unique :
+    chaque rotation crée le suivant dans la même famille (session de login)
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+class RevokedToken(Base):
+    """Identifiant révoqué (jti d'un access token ou session "fam") jusqu'à expires_at"""
+    __tablename__ = "revoked_tokens"
+
+    token_id = Column(String(64), primary_key=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ApiKey(Base):
+    """Clé d'API d'un client machine : préfixe public + HMAC de la clé complète"""
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    prefix = Column(String(16), nullable=False, unique=True)
+    key_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+class ShadowPrediction(Base):
+    """Résultat compact d'un modèle challenger sur une prédiction réelle"""
+    __tablename__ = "shadow_predictions"
+
+    id = Column(Integer, primary_key=True)
+    # Pas de clé étrangère : table découplée, écrite en arrière-plan
+    prediction_id = Column(Integer, nullable=True, index=True)
+    champion_version = Column(String, nullable=False)
+    challenger_version = Column(String, nullable=False)
+    champion_probability = Column(Float, nullable=False)
+    probability = Column(Float, nullable=False)
+    agrees = Column(Boolean, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_shadow_challenger_created", "challenger_version", "created_at"),
+    )
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
     print("✅ Tables créées avec succès")
@@ -59,3 +164,7 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
@@ -0,0 +1,130 @@
+"""
+Exécuteur dédié et borné pour l'inférence du modèle
+(hors de la boucle asyncio des workers uvicorn)
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from app.config import settings
+from app.metrics import Histogram
+from app.predictor import Score, predictor
+
+logger = logging.getLogger(__name__)
+
+LATENCY_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class InferenceOverloaded(RuntimeError):
+    """File d'inférence pleine : la requête doit être rejetée (503)"""
+
+
+def _predict_rows(
+    rows: List[Sequence[float]],
+    version: Optional[str] = None
+) -> List[Score]:
+    """
+    Point d'entrée exécuté dans le pool (importable pour le mode process)
+
+    En mode process, `version` aligne le modèle du processus enfant sur
+    celui du worker parent (après un hot reload).
+    """
+    from app.predictor import predictor
+    if version is not None:
+        predictor.ensure_version(version)
+    return predictor.predict_batch(rows)
+
+
+def _warmup() -> None:
+    """Charge le modèle dès le démarrage d'un processus du pool"""
+    from app.predictor import predictor
+    predictor.limit_threads()
+
+
+class InferenceExecutor:
+    """
+    Pool d'inférence borné (threads ou processus selon la config)
+
+    Au plus `max_workers` inférences s'exécutent en parallèle et
+    `max_queue` attendent ; au-delà, InferenceOverloaded est levée
+    immédiatement plutôt que d'allonger la file.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"INFERENCE_EXECUTOR inconnu : {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self.rejected = 0
+        self.latency_ms = Histogram(LATENCY_MS_BUCKETS)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn : pas de fork d'un processus qui fait tourner des threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warmup,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference",
+                )
+            logger.info(
+                "✅ Pool d'inférence %s démarré (%s workers, file=%s)",
+                self.kind, self.max_workers, self.max_queue
+            )
+        return self._pool
+
+    async def predict_batch(
+        self,
+        rows: Sequence[Sequence[float]]
+    ) -> List[Score]:
+        """Évalue `rows` dans le pool, ou lève InferenceOverloaded si saturé"""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise InferenceOverloaded("File d'inférence pleine")
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            version = predictor.version if self.kind == "process" else None
+            return await loop.run_in_executor(
+                self._get_pool(), _predict_rows, list(rows), version
+            )
+        finally:
+            self._in_flight -= 1
+            self.latency_ms.observe((time.perf_counter() - start) * 1000)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_metrics(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+
+# Singleton global utilisé par les routes de prédiction
+inference_executor = InferenceExecutor(
+    kind=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_MAX_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+)
@@ -0,0 +1,132 @@
+"""
+Export en flux de la table predictions (CSV, Parquet)
+
+Les lignes sont lues par blocs sur un curseur côté serveur (stream_results
++ yield_per) et chaque bloc est sérialisé puis envoyé avant de lire le
+suivant : mémoire constante quelle que soit la taille de l'export.
+Parquet nécessite pyarrow (optionnel) : un groupe de lignes par bloc.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app.database import Prediction
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # export Parquet indisponible
+    pa = pq = None
+
+EXPORT_COLUMNS = (
+    "id", "user_id", "age", "income", "credit_amount", "duration",
+    "decision", "probability", "model_version", "created_at", "ip_address",
+)
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def predictions_export_query(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    model_version: Optional[str] = None,
+):
+    """
+    SELECT des colonnes exportées ; le filtre sur created_at permet à
+    PostgreSQL d'écarter les partitions hors plage
+    """
+    columns = Prediction.__table__.c
+    conditions = []
+    if created_from is not None:
+        conditions.append(columns.created_at >= created_from)
+    if created_to is not None:
+        conditions.append(columns.created_at < created_to)
+    if user_id is not None:
+        conditions.append(columns.user_id == user_id)
+    if model_version is not None:
+        conditions.append(columns.model_version == model_version)
+    return select(*(columns[name] for name in EXPORT_COLUMNS)).where(*conditions)
+
+
+def _chunks(bind, query, chunk_size: int) -> Iterator[List[tuple]]:
+    # Connexion dédiée : le flux survit à la session de la requête
+    with bind.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=chunk_size
+        ).execute(query)
+        for partition in result.partitions():
+            yield partition
+
+
+def iter_csv(bind, query, chunk_size: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in _chunks(bind, query, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Fichier en écriture seule qui garde les octets jusqu'au prochain drain() ;
+    tell() reste cumulatif (le pied de page Parquet référence des offsets
+    absolus)
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("id", pa.int64()), ("user_id", pa.int64()), ("age", pa.int32()),
+        ("income", pa.float64()), ("credit_amount", pa.float64()),
+        ("duration", pa.int32()), ("decision", pa.string()),
+        ("probability", pa.float64()), ("model_version", pa.string()),
+        ("created_at", pa.timestamp("us")), ("ip_address", pa.string()),
+    ])
+
+
+def iter_parquet(bind, query, chunk_size: int) -> Iterator[bytes]:
+    if not parquet_available():
+        raise RuntimeError("pyarrow n'est pas installé")
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for rows in _chunks(bind, query, chunk_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    # Pied de page (métadonnées) écrit à la fermeture
+    yield sink.drain()
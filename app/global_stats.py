@@ -0,0 +1,155 @@
+"""
+Statistiques globales de /admin/stats servies depuis un instantané
+
+L'instantané est recalculé en arrière-plan quand il dépasse
+ADMIN_STATS_TTL_SECONDS (stale-while-revalidate) : le tableau de bord ne
+déclenche jamais lui-même de COUNT(*) sur predictions, sauf au tout premier
+appel. En mode approximatif, les volumes viennent des statistiques du
+planificateur PostgreSQL (pg_class.reltuples, mises à jour par ANALYZE /
+autovacuum).
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, text
+
+from app.config import settings
+from app.database import Prediction, User
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    figures: dict
+    exact: bool
+    taken_at: float  # time.monotonic()
+    refreshed_at: datetime
+
+
+def exact_counts(conn) -> dict:
+    return {
+        "total_users": conn.execute(select(func.count(User.id))).scalar(),
+        "total_predictions": conn.execute(select(func.count(Prediction.id))).scalar(),
+    }
+
+
+class RelationStats(NamedTuple):
+    is_parent: bool
+    relkind: str
+    reltuples: float  # -1 : jamais analysée (PostgreSQL ≥ 14)
+
+
+def combine_estimates(relations: List[RelationStats]) -> Optional[int]:
+    """
+    Estimation d'une table à partir de ses lignes pg_class (elle-même et ses
+    partitions) ; None si rien n'a jamais été analysé
+
+    Table partitionnée : le total du parent s'il a été analysé (ANALYZE sur
+    le parent), sinon la somme des partitions feuilles, une partition jamais
+    analysée (DEFAULT, mois à venir, souvent vides) comptant pour 0.
+    """
+    parent = next((r for r in relations if r.is_parent), None)
+    if parent is None:
+        return None
+    if parent.reltuples >= 0:
+        return int(parent.reltuples)
+    if parent.relkind != "p":
+        return None
+    leaves = [r for r in relations if not r.is_parent and r.relkind != "p"]
+    if not any(r.reltuples >= 0 for r in leaves):
+        return None
+    return int(sum(max(r.reltuples, 0) for r in leaves))
+
+
+def estimated_rows(conn, table: str) -> Optional[int]:
+    """Estimation du planificateur (voir combine_estimates)"""
+    rows = conn.execute(text(
+        "SELECT c.oid = CAST(:table AS regclass), c.relkind, c.reltuples "
+        "FROM pg_class c "
+        "WHERE c.oid = CAST(:table AS regclass) "
+        "   OR c.oid IN (SELECT inhrelid FROM pg_inherits "
+        "                WHERE inhparent = CAST(:table AS regclass))"
+    ), {"table": table})
+    return combine_estimates([RelationStats(*row) for row in rows])
+
+
+def approximate_counts(conn) -> Tuple[dict, bool]:
+    """(chiffres, exact) : retombe sur COUNT(*) hors PostgreSQL ou sans ANALYZE"""
+    if conn.dialect.name != "postgresql":
+        return exact_counts(conn), True
+    users = estimated_rows(conn, User.__tablename__)
+    predictions = estimated_rows(conn, Prediction.__tablename__)
+    if users is None or predictions is None:
+        return exact_counts(conn), True
+    return {"total_users": users, "total_predictions": predictions}, False
+
+
+class GlobalStatsSnapshot:
+    """Un instantané par mode (exact / approximatif), rafraîchi en arrière-plan"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshots: Dict[bool, Snapshot] = {}
+        self._refreshing: set = set()
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _compute(self, bind, approximate: bool) -> Snapshot:
+        with bind.connect() as conn:
+            if approximate:
+                figures, exact = approximate_counts(conn)
+            else:
+                figures, exact = exact_counts(conn), True
+        snapshot = Snapshot(figures, exact, time.monotonic(), datetime.utcnow())
+        with self._lock:
+            self._snapshots[approximate] = snapshot
+            self.refreshes += 1
+        return snapshot
+
+    def _refresh_in_background(self, bind, approximate: bool) -> None:
+        with self._lock:
+            if approximate in self._refreshing:
+                return
+            self._refreshing.add(approximate)
+
+        def run():
+            try:
+                self._compute(bind, approximate)
+            except Exception:
+                self.refresh_failures += 1
+                logger.exception("❌ Rafraîchissement des statistiques globales impossible")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(approximate)
+
+        threading.Thread(target=run, name="global-stats-refresh", daemon=True).start()
+
+    def get(self, bind, approximate: bool = False) -> dict:
+        """
+        Chiffres de l'instantané courant, même périmé ; un instantané périmé
+        déclenche un rafraîchissement en arrière-plan
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(approximate)
+        if snapshot is None:
+            snapshot = self._compute(bind, approximate)
+        elif time.monotonic() - snapshot.taken_at > self.ttl_seconds:
+            self._refresh_in_background(bind, approximate)
+        return {
+            **snapshot.figures,
+            "exact": snapshot.exact,
+            "snapshot_age_seconds": round(time.monotonic() - snapshot.taken_at, 3),
+            "refreshed_at": snapshot.refreshed_at,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+# Singleton global
+global_stats_snapshot = GlobalStatsSnapshot(ttl_seconds=settings.ADMIN_STATS_TTL_SECONDS)
@@ -0,0 +1,114 @@
+"""
+Service de hachage des mots de passe (bcrypt) sur un pool dédié et borné
+
+bcrypt coûte plusieurs dizaines de millisecondes de CPU par appel : exécuté
+sur le threadpool partagé de FastAPI, un afflux de connexions affamerait
+toutes les routes synchrones. Les routes async passent par
+`password_hasher` ; les scripts (init_bd.py, init_admin.py) gardent les
+fonctions synchrones de app/security.py, qui utilisent le même contexte.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+LATENCY_MS_BUCKETS = (10, 25, 50, 100, 200, 300, 500, 1000, 2500, 5000)
+
+# Contexte unique partagé par app/security.py et app/auth.py
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashingOverloaded(RuntimeError):
+    """File de hachage pleine : la requête doit être rejetée (503)"""
+
+
+class PasswordHasher:
+    """
+    Pool de hachage borné : au plus `max_workers` calculs bcrypt en
+    parallèle et `max_queue` en attente ; au-delà, HashingOverloaded est
+    levée immédiatement.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        # Attente dans la file, puis durée du calcul bcrypt lui-même
+        self.queue_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.hash_ms = Histogram(LATENCY_MS_BUCKETS)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="bcrypt")
+        return self._pool
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def _run(self, fn: Callable, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HashingOverloaded("File de hachage pleine")
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self.queue_ms.observe((started - submitted) * 1000)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_ms.observe((time.perf_counter() - started) * 1000)
+
+        try:
+            future = self._get_pool().submit(timed)
+        except BaseException:
+            self._release(None)
+            raise
+        # Libéré quand bcrypt a vraiment fini (ou n'a jamais démarré), pas
+        # quand la requête abandonne : une annulation ne dépasse pas la borne
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(pwd_context.verify, plain, hashed)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_metrics(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            "queue_ms": self.queue_ms.snapshot(),
+            "hash_ms": self.hash_ms.snapshot(),
+        }
+
+
+# Singleton global utilisé par /auth/login et /auth/register
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
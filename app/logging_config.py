@@ -0,0 +1,119 @@
+"""
+Configuration du logging : file (QueueHandler) vidée par un thread de fond,
+échantillonnage par logger et format texte ou JSON
+
+Les niveaux et taux d'échantillonnage se règlent par variables
+d'environnement, par exemple :
+    LOG_LEVELS='{"app.predictor": "WARNING", "sqlalchemy.engine": "INFO"}'
+    LOG_SAMPLING='{"app.predictor": 0.01}'
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributs standards d'un LogRecord (le reste vient de `extra=`)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne ; les champs passés via `extra=` sont conservés"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(
+            {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS}
+        )
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne garde qu'une fraction des records sous WARNING, par préfixe de logger
+    (la règle la plus spécifique l'emporte) ; WARNING et au-delà passent toujours
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Du plus spécifique au plus général
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def _rate(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler qui ne formate pas dans le thread appelant : le message
+    (et la trace d'exception) est rendu par le thread du QueueListener
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> QueueListener:
+    """Installe le pipeline (idempotent) et démarre le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """
+    Vide la file et arrête le thread d'écriture ; les handlers repassent
+    en direct sur le root logger pour les derniers messages
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        root.handlers = list(_listener.handlers)
+        _listener = None
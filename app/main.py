@@ -1,9 +1,20 @@
 # main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 import logging
 
-from app.database import create_tables
-from app.predictor import predictor
+from app.batching import batcher
+from app.config import settings
+from app.database import async_engine, create_tables
+from app.executor import InferenceOverloaded, inference_executor
+from app.hashing import HashingOverloaded, password_hasher
+from app.logging_config import setup_logging, shutdown_logging
+from app.partitions import partition_maintainer
+from app.predictor import model_watcher, predictor
+from app.replicas import replica_router
+from app.revocation import revocation_list
+from app.shadow import shadow_scorer
+from app.write_behind import prediction_writer
 from app.routers import auth, predictions, admin, model
 
 from app.crud import (
@@ -14,10 +25,7 @@ from app.crud import (
 
 
 # ==================== Logging ====================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # ==================== Application FastAPI ====================
@@ -36,16 +44,62 @@ async def startup_event():
     # Créer les tables si nécessaire
     create_tables()
     logger.info("✅ Tables de base de données créées")
+    # Partitions du mois courant et des suivants (si predictions est partitionnée)
+    partition_maintainer.start()
+    replica_router.start()
+    # Filtre des tokens révoqués (rafraîchi en arrière-plan)
+    revocation_list.start()
 
     # Vérifier le modèle ML
     if predictor.is_loaded():
         logger.info("✅ Modèle ML chargé avec succès")
     else:
         logger.error("❌ Modèle ML non chargé")
+    model_watcher.start(predictor.version)
+    # BLAS / OpenMP limités au budget du worker (INFERENCE_THREAD_BUDGET)
+    predictor.limit_threads()
+
+    if settings.MICRO_BATCHING_ENABLED:
+        await batcher.start()
+    shadow_scorer.start()
+    if settings.PREDICTION_WRITE_MODE == "write_behind":
+        prediction_writer.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 Arrêt de l'API Credit Scoring")
+    await batcher.stop()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    shadow_scorer.stop()
+    prediction_writer.stop()
+    await async_engine.dispose()
+    replica_router.stop()
+    await replica_router.dispose()
+    model_watcher.stop()
+    predictor.restore_threads()
+    partition_maintainer.stop()
+    revocation_list.stop()
+    shutdown_logging()
+
+# ==================== Exception Handlers ====================
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request: Request, exc: InferenceOverloaded):
+    """Délestage : file d'inférence pleine → 503 immédiat"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service surchargé, réessayez plus tard"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+    """Afflux de login / register : file bcrypt pleine → 503 immédiat"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service surchargé, réessayez plus tard"},
+        headers={"Retry-After": "1"},
+    )
 
 # ==================== Include Routers ====================
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -0,0 +1,56 @@
+"""
+Instruments de mesure en mémoire (histogrammes) partagés par les modules
+"""
+import bisect
+import threading
+from typing import List, Sequence
+
+
+class Histogram:
+    """Histogramme à buckets fixes (bornes supérieures inclusives), thread-safe"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets: List[float] = sorted(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def _quantile(self, q: float) -> float:
+        """Quantile approché : borne supérieure du bucket atteint"""
+        if self._count == 0:
+            return 0.0
+        rank = q * self._count
+        cumulative = 0
+        for bound, n in zip(self.buckets, self._counts):
+            cumulative += n
+            if cumulative >= rank:
+                return bound
+        return self._max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [str(b) for b in self.buckets] + ["+Inf"]
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": self._sum / self._count if self._count else 0.0,
+                "max": self._max,
+                "p50": self._quantile(0.50),
+                "p99": self._quantile(0.99),
+                "buckets": dict(zip(labels, self._counts)),
+            }
@@ -0,0 +1,65 @@
+"""
+Pagination par curseur (keyset) sur (created_at, id)
+
+Le curseur est opaque pour le client : base64url d'un petit JSON contenant
+la position de la dernière ligne renvoyée.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou falsifié"""
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: int
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict):
+        raise TypeError(payload)
+    return payload
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    return _encode({"t": created_at.isoformat(), "id": id})
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        payload = _decode(token)
+        return Cursor(datetime.fromisoformat(payload["t"]), int(payload["id"]))
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(token) from e
+
+
+def encode_id_cursor(id: int) -> str:
+    """Curseur sur la seule clé primaire (listes triées par id)"""
+    return _encode({"id": id})
+
+
+def decode_id_cursor(token: str) -> int:
+    try:
+        return int(_decode(token)["id"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(token) from e
+
+
+def next_cursor(rows, limit: int):
+    """Curseur de la page suivante, None si la page n'est pas pleine"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,247 @@
+"""
+Partitions mensuelles de la table predictions (PostgreSQL)
+
+La migration 7d2a9c4e8f15 transforme `predictions` en table partitionnée
+par plage (RANGE) sur created_at, une partition par mois
+(predictions_y2026m10, ...) plus une partition DEFAULT de secours.
+Ce module crée les partitions à venir et applique la rétention en
+détachant / supprimant les partitions expirées, jamais par DELETE.
+
+Hors PostgreSQL, ou si la migration n'a pas été appliquée, tout est no-op.
+"""
+import logging
+import re
+import threading
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import Prediction, engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "predictions"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+COLUMNS = ", ".join(column.name for column in Prediction.__table__.columns)
+# Verrou consultatif : plusieurs workers peuvent lancer la maintenance
+ADVISORY_LOCK_KEY = 0x70726564  # "pred"
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: date
+    end: date
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_bound(expression: str) -> Optional[tuple]:
+    """'FOR VALUES FROM (...) TO (...)' → (début, fin) ; None pour DEFAULT"""
+    match = _BOUND.search(expression)
+    if match is None:
+        return None
+    start, end = (datetime.fromisoformat(value).date() for value in match.groups())
+    return start, end
+
+
+def expired_partitions(partitions: List[Partition], retention_months: int,
+                       today: date) -> List[Partition]:
+    """Partitions dont toute la plage précède la fenêtre de rétention"""
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today), -retention_months)
+    return [p for p in partitions if p.end <= cutoff]
+
+
+def is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :parent AND c.relnamespace = 'public'::regnamespace"
+    ), {"parent": PARENT_TABLE}).first())
+
+
+def list_partitions(conn) -> List[Partition]:
+    """Partitions mensuelles attachées, triées (la partition DEFAULT est exclue)"""
+    rows = conn.execute(text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE})
+    partitions = []
+    for name, bound in rows:
+        parsed = parse_bound(bound)
+        if parsed is not None:
+            partitions.append(Partition(name, *parsed))
+    return sorted(partitions, key=lambda p: p.start)
+
+
+def has_default_partition(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :parent AND child.relname = :default"
+    ), {"parent": PARENT_TABLE, "default": DEFAULT_PARTITION}).first())
+
+
+def create_partition(conn, month: date) -> str:
+    """
+    Crée la partition de `month`
+
+    Si la partition DEFAULT contient déjà des lignes de ce mois (maintenance
+    arrêtée ou en retard au changement de mois), CREATE ... PARTITION OF
+    échouerait : DEFAULT est détachée, la partition créée, les lignes
+    déplacées, puis DEFAULT rattachée, dans la même transaction.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    create = text(
+        f'CREATE TABLE "{name}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{add_months(month, 1).isoformat()}')"
+    )
+    in_range = "created_at >= :start AND created_at < :end"
+    stranded = has_default_partition(conn) and conn.execute(text(
+        f'SELECT count(*) FROM "{DEFAULT_PARTITION}" WHERE {in_range}'
+    ), bounds).scalar()
+    if not stranded:
+        conn.execute(create)
+        return name
+
+    logger.warning("⚠️ %d prédictions de %s dans %s : déplacement vers %s",
+                   stranded, month.strftime("%Y-%m"), DEFAULT_PARTITION, name)
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{DEFAULT_PARTITION}"'))
+    conn.execute(create)
+    conn.execute(text(
+        f'INSERT INTO "{name}" ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM "{DEFAULT_PARTITION}" WHERE {in_range}'
+    ), bounds)
+    conn.execute(text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range}'), bounds)
+    conn.execute(text(
+        f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT'
+    ))
+    return name
+
+
+def _lock(conn) -> None:
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+def ensure_future_partitions(conn, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Crée les partitions du mois courant et des `months_ahead` suivants
+
+    À appeler dans une transaction (engine.begin()).
+
+    Returns:
+        les noms des partitions créées
+    """
+    if not is_partitioned(conn):
+        return []
+    _lock(conn)
+    existing = {p.start for p in list_partitions(conn)}
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        created.append(create_partition(conn, month))
+    if created:
+        logger.info("🗂️ Partitions créées : %s", ", ".join(created))
+    return created
+
+
+def apply_retention(conn, retention_months: int, mode: str = "detach",
+                    today: Optional[date] = None, dry_run: bool = False) -> List[str]:
+    """
+    Détache (mode "detach") ou supprime (mode "drop") les partitions
+    entièrement antérieures à `retention_months` mois
+
+    Une partition détachée reste une table autonome (archivage, pg_dump)
+    que l'on peut supprimer plus tard.
+    """
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"Mode de rétention inconnu : {mode}")
+    if not is_partitioned(conn):
+        return []
+    _lock(conn)
+    expired = expired_partitions(list_partitions(conn), retention_months,
+                                 today or datetime.utcnow().date())
+    if dry_run:
+        return [p.name for p in expired]
+    for partition in expired:
+        conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{partition.name}"'))
+        if mode == "drop":
+            conn.execute(text(f'DROP TABLE "{partition.name}"'))
+        logger.info("🧹 Partition %s %s", partition.name,
+                    "supprimée" if mode == "drop" else "détachée")
+    return [p.name for p in expired]
+
+
+class PartitionMaintainer:
+    """Crée périodiquement les partitions à venir (thread de fond)"""
+
+    def __init__(self, engine, months_ahead: int, interval: float):
+        self.engine = engine
+        self.months_ahead = months_ahead
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> List[str]:
+        try:
+            with self.engine.begin() as conn:
+                return ensure_future_partitions(conn, self.months_ahead)
+        except Exception:
+            logger.exception("❌ Création des partitions impossible")
+            return []
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        if self.engine.dialect.name != "postgresql":
+            return
+        self.run_once()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="partition-maintainer",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+# Singleton global, démarré au startup (no-op hors PostgreSQL)
+partition_maintainer = PartitionMaintainer(
+    engine,
+    months_ahead=settings.PARTITION_MONTHS_AHEAD,
+    interval=settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,141 @@
+"""
+Instrumentation des pools de connexions SQLAlchemy
+
+Mesure l'attente au checkout (distingue un pool saturé d'une requête lente),
+les connexions en cours d'utilisation, le débordement (max_overflow) et les
+échecs de pre-ping.
+"""
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import settings
+from app.metrics import Histogram
+
+CHECKOUT_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+
+class PoolMonitor:
+    """Compteurs d'un pool (un moniteur par moteur)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait_seconds = Histogram(CHECKOUT_WAIT_BUCKETS)
+        self._lock = threading.Lock()
+        self.engine: Optional[Engine] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.pre_ping_failures = 0
+        self.invalidations = 0
+        self.peak_in_use = 0
+
+    @property
+    def pool(self) -> Optional[Pool]:
+        # Relu sur le moteur : engine.dispose() remplace l'instance du pool
+        return self.engine.pool if self.engine is not None else None
+
+    def attach(self, engine: Engine) -> None:
+        """Branche les événements du pool (conservés par pool.recreate())"""
+        self.engine = engine
+        event.listen(engine.pool, "connect", self._on_connect)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+            # QueuePool incrémente overflow() avant d'ouvrir la connexion :
+            # > 0 signifie une connexion au-delà de pool_size
+            if isinstance(self.pool, QueuePool) and self.pool.overflow() > 0:
+                self.overflow_connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        in_use = self.pool.checkedout() if isinstance(self.pool, QueuePool) else 0
+        with self._lock:
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+            # Le pre-ping lève une DisconnectionError quand la connexion est morte
+            if isinstance(exception, exc.DisconnectionError):
+                self.pre_ping_failures += 1
+
+    def observe_wait(self, seconds: float, timed_out: bool) -> None:
+        self.checkout_wait_seconds.observe(seconds)
+        if timed_out:
+            with self._lock:
+                self.timeouts += 1
+
+    def get_metrics(self) -> dict:
+        pool = self.pool
+        queue_pool = isinstance(pool, QueuePool)
+        return {
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "size": pool.size() if queue_pool else None,
+            "in_use": pool.checkedout() if queue_pool else None,
+            "idle": pool.checkedin() if queue_pool else None,
+            "overflow": max(pool.overflow(), 0) if queue_pool else None,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "overflow_connects": self.overflow_connects,
+            "pre_ping_failures": self.pre_ping_failures,
+            "invalidations": self.invalidations,
+            "checkout_wait_seconds": self.checkout_wait_seconds.snapshot(),
+        }
+
+
+def instrumented_pool_class(monitor: PoolMonitor, base: Type[QueuePool]) -> Type[QueuePool]:
+    """
+    Sous-classe de `base` qui chronomètre _do_get (attente d'une connexion
+    libre, ouverture comprise) ; le moniteur est un attribut de classe pour
+    survivre à pool.recreate() (engine.dispose())
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                timed_out = True
+                raise
+            finally:
+                monitor.observe_wait(time.perf_counter() - start, timed_out)
+
+    InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{base.__name__}"
+    InstrumentedPool.monitor = monitor
+    return InstrumentedPool
+
+
+def pool_options(url: str, monitor: PoolMonitor, asyncio: bool = False) -> dict:
+    """
+    Arguments de create_engine pour le pool instrumenté ; SQLite garde le pool
+    choisi par son dialecte (SingletonThreadPool pour :memory:)
+    """
+    if url.startswith("sqlite"):
+        return {}
+    base = AsyncAdaptedQueuePool if asyncio else QueuePool
+    return {
+        "poolclass": instrumented_pool_class(monitor, base),
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+
+
+# Un moniteur par moteur, exposés sur /admin/metrics/pool
+pool_monitors: Dict[str, PoolMonitor] = {
+    "sync": PoolMonitor("sync"),
+    "async": PoolMonitor("async"),
+}
@@ -5,12 +5,36 @@ Logique de chargement et prédiction du modèle ML
 import joblib
 import numpy as np
 import logging
+import threading
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 
+from threadpoolctl import threadpool_limits
+
+from app.compiled_forest import CompiledForest
 from app.config import settings
+from app.registry import ManifestWatcher, ModelRegistry
 
 logger = logging.getLogger(__name__)
+# Logs par requête (chemin critique), réglables à part :
+# LOG_LEVELS / LOG_SAMPLING sur "app.predictor.requests"
+request_logger = logging.getLogger(f"{__name__}.requests")
+
+
+class LoadedModel(NamedTuple):
+    """Modèle chargé et ses métadonnées (immuable, remplacé en bloc au reload)"""
+    version: str
+    model: object
+    config: dict
+    path: Path
+    backend: str
+
+
+class Score(NamedTuple):
+    """Résultat d'une ligne, avec la version exacte du modèle qui l'a évaluée"""
+    decision: str
+    probability: float
+    model_version: str
 
 
 class CreditScoringPredictor:
@@ -22,30 +46,217 @@ class CreditScoringPredictor:
         """
         # Sécurisation du chemin (str → Path)
         self.model_path: Path = Path(settings.MODEL_PATH)
-        self.model_config = settings.MODEL_CONFIG
-        self.model: Optional[object] = None
+        self.registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+        self.backend: str = settings.INFERENCE_BACKEND
+        self.load_mode: str = settings.MODEL_LOAD_MODE
+
+        self._active: Optional[LoadedModel] = None
+        self._reload_lock = threading.Lock()
+
+        # Budget de threads par worker : n_jobs du modèle ici, BLAS / OpenMP
+        # au démarrage du serveur (limit_threads, réglage global au processus)
+        self.thread_budget: int = settings.INFERENCE_THREAD_BUDGET
+        self._thread_limits: Optional[threadpool_limits] = None
+
+        self.swap(self.load_version())
+
+    def limit_threads(self) -> None:
+        """
+        Limite BLAS / OpenMP au budget pour tout le processus ; appelé une
+        fois au démarrage (worker uvicorn ou processus du pool d'inférence)
+        """
+        if self.thread_budget and self._thread_limits is None:
+            self._thread_limits = threadpool_limits(limits=self.thread_budget)
+
+    def restore_threads(self) -> None:
+        """Rétablit les limites d'origine (arrêt)"""
+        if self._thread_limits is not None:
+            self._thread_limits.restore_original_limits()
+            self._thread_limits = None
+
+    # ------------------------------------------------------------------
+    # Modèle actif
+    # ------------------------------------------------------------------
+    @property
+    def model(self) -> Optional[object]:
+        return self._active.model if self._active else None
+
+    @property
+    def model_config(self) -> dict:
+        return self._active.config if self._active else settings.MODEL_CONFIG
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._active.version if self._active else None
+
+    def current(self) -> Optional[LoadedModel]:
+        return self._active
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+    def load_version(self, version: Optional[str] = None) -> LoadedModel:
+        """
+        Charge une version sans l'activer
+
+        Avec un registre (manifest présent), `version` vaut par défaut la
+        version active du manifest ; sinon MODEL_PATH / MODEL_CONFIG.
+        """
+        config = dict(settings.MODEL_CONFIG)
+        if self.registry.exists():
+            version = version or self.registry.active_version()
+            entry = self.registry.entry(version)
+            path = entry.pop("path")
+            config.update(
+                {k: v for k, v in entry.items() if k in settings.MODEL_CONFIG}
+            )
+            config["version"] = version
+            mmap_path = path.with_suffix(".compiled.joblib")
+        else:
+            if version is not None and version != config["version"]:
+                raise KeyError(f"Version de modèle inconnue : {version}")
+            path = self.model_path
+            mmap_path = Path(
+                settings.MODEL_MMAP_PATH or path.with_suffix(".compiled.joblib")
+            )
 
-        self._load_model()
+        model, backend = self._load_model(path, mmap_path)
+        return LoadedModel(
+            version=str(config["version"]),
+            model=model,
+            config=config,
+            path=path,
+            backend=backend,
+        )
 
-    def _load_model(self) -> None:
+    def _load_model(self, path: Path, mmap_path: Path) -> Tuple[object, str]:
         """Charge le modèle depuis le fichier"""
         try:
-            if not self.model_path.exists():
+            if not path.exists():
                 raise FileNotFoundError(
-                    f"❌ Modèle introuvable : {self.model_path}"
+                    f"❌ Modèle introuvable : {path}"
                 )
 
-            self.model = joblib.load(self.model_path)
-            logger.info(f"✅ Modèle ML chargé depuis {self.model_path}")
+            if self.load_mode == "mmap" and self.backend == "compiled":
+                model, backend = self._load_mmap(path, mmap_path), "compiled"
+            else:
+                if self.load_mode == "mmap":
+                    logger.warning(
+                        "⚠️ MODEL_LOAD_MODE=mmap requiert INFERENCE_BACKEND=compiled "
+                        "(les arbres sklearn sont recopiés au chargement)"
+                    )
+                model, backend = self._compile(joblib.load(path))
+            logger.info(
+                f"✅ Modèle ML chargé depuis {path} "
+                f"(backend={backend}, mode={self.load_mode})"
+            )
+            return model, backend
 
         except Exception as e:
             logger.exception("❌ Échec du chargement du modèle")
             raise
 
+    def _load_mmap(self, path: Path, mmap_path: Path) -> CompiledForest:
+        """
+        Charge la forêt compilée en mmap ; l'artefact est (re)généré s'il
+        est absent ou plus ancien que le modèle source
+        """
+        if (
+            not mmap_path.exists()
+            or mmap_path.stat().st_mtime < path.stat().st_mtime
+        ):
+            logger.info("🔧 Génération de l'artefact mmap %s", mmap_path)
+            CompiledForest.from_estimator(joblib.load(path)).save(mmap_path)
+        return CompiledForest.load(mmap_path, mmap_mode="r")
+
+    def _limit_parallelism(self, model: object) -> None:
+        """
+        Remplace le n_jobs de l'entraînement (souvent -1 : tous les cœurs)
+        par le budget du worker, sur le modèle et ses estimateurs imbriqués
+        (ex. AutoML FLAML → .model.estimator)
+        """
+        if not self.thread_budget:
+            return
+        seen = set()
+        pending = [model]
+        while pending:
+            obj = pending.pop()
+            if obj is None or id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            if getattr(obj, "n_jobs", None) not in (None, self.thread_budget):
+                obj.n_jobs = self.thread_budget
+            pending.extend(
+                getattr(obj, attr, None) for attr in ("model", "estimator", "_trained_estimator")
+            )
+
+    def _compile(self, model: object) -> Tuple[object, str]:
+        """Applique le backend d'inférence configuré au modèle chargé"""
+        self._limit_parallelism(model)
+        if self.backend == "sklearn":
+            return model, "sklearn"
+        if self.backend != "compiled":
+            raise ValueError(f"INFERENCE_BACKEND inconnu : {self.backend}")
+
+        try:
+            return CompiledForest.from_estimator(model), "compiled"
+        except TypeError as e:
+            logger.warning("⚠️ %s : repli sur le backend sklearn", e)
+            return model, "sklearn"
+
+    def swap(self, loaded: LoadedModel) -> None:
+        """
+        Active `loaded` par simple remplacement de référence : les prédictions
+        en cours terminent sur l'ancien modèle qu'elles ont déjà capturé
+        """
+        previous = self._active
+        self._active = loaded
+        if previous is None or previous.version != loaded.version:
+            logger.info(
+                "🔄 Modèle actif : v%s (précédent : %s)",
+                loaded.version, f"v{previous.version}" if previous else "aucun"
+            )
+
+    def reload(self, version: Optional[str] = None) -> LoadedModel:
+        """Charge puis active une version (reloads sérialisés)"""
+        with self._reload_lock:
+            loaded = self.load_version(version)
+            self.swap(loaded)
+            return loaded
+
+    def promote(self, version: str) -> LoadedModel:
+        """
+        Charge et active `version` sur ce worker, puis seulement en cas de
+        succès la rend active dans le manifest (suivi par les autres workers) :
+        un artefact corrompu ne se propage pas
+        """
+        loaded = self.reload(version)
+        if self.registry.exists():
+            self.registry.set_active(version)
+        return loaded
+
+    def ensure_version(self, version: str) -> None:
+        """Recharge si le modèle actif n'est pas `version` (workers du pool process)"""
+        if self.version != version:
+            self.reload(version)
+
+    # ------------------------------------------------------------------
+    # Prédiction
+    # ------------------------------------------------------------------
     def is_loaded(self) -> bool:
         """Indique si le modèle est chargé"""
         return self.model is not None
 
+    def _check_ready(self, active: Optional[LoadedModel]) -> None:
+        """Vérifie que le modèle est utilisable pour une prédiction"""
+        if active is None:
+            raise RuntimeError("❌ Le modèle n'est pas chargé")
+
+        if not hasattr(active.model, "predict_proba"):
+            raise RuntimeError(
+                "❌ Le modèle ne supporte pas predict_proba()"
+            )
+
     def predict(
         self,
         age: int,
@@ -59,34 +270,31 @@ class CreditScoringPredictor:
         Returns:
             ("APPROVED" | "REJECTED", probabilité)
         """
-        if not self.is_loaded():
-            raise RuntimeError("❌ Le modèle n'est pas chargé")
-
-        if not hasattr(self.model, "predict_proba"):
-            raise RuntimeError(
-                "❌ Le modèle ne supporte pas predict_proba()"
-            )
+        active = self._active
+        self._check_ready(active)
 
         try:
             features = np.array([[age, income, credit_amount, duration]])
 
-            logger.info(
+            request_logger.info(
                 "🔍 Prédiction | age=%s income=%s credit=%s duration=%s",
                 age, income, credit_amount, duration
             )
 
             probability: float = float(
-                self.model.predict_proba(features)[0, 1]
+                active.model.predict_proba(features)[0, 1]
             )
 
-            threshold = self.model_config["threshold"]
+            threshold = active.config["threshold"]
             decision = (
                 "APPROVED" if probability >= threshold else "REJECTED"
             )
 
-            logger.info(
+            request_logger.info(
                 "✅ Résultat: %s (probabilité=%.3f)",
-                decision, probability
+                decision, probability,
+                extra={"decision": decision, "probability": probability,
+                       "model_version": active.version}
             )
 
             return decision, probability
@@ -95,17 +303,74 @@ class CreditScoringPredictor:
             logger.exception("❌ Erreur lors de la prédiction")
             raise
 
+    def predict_batch(
+        self,
+        rows: Sequence[Sequence[float]],
+        loaded: Optional[LoadedModel] = None
+    ) -> List[Score]:
+        """
+        Fait une prédiction sur plusieurs demandes en un seul appel
+        à predict_proba (matrice 2-D)
+
+        Args:
+            rows: liste de (age, income, credit_amount, duration)
+            loaded: modèle à utiliser (challenger...) ; par défaut le modèle actif
+
+        Returns:
+            liste de Score(decision, probabilité, version), dans l'ordre
+        """
+        active = loaded or self._active
+        self._check_ready(active)
+
+        if not rows:
+            return []
+
+        try:
+            features = np.asarray(rows, dtype=np.float64).reshape(
+                -1, len(active.config["features"])
+            )
+
+            request_logger.info(
+                "🔍 Prédiction batch | %d lignes", len(features),
+                extra={"rows": len(features), "model_version": active.version}
+            )
+
+            probabilities = active.model.predict_proba(features)[:, 1]
+
+            threshold = active.config["threshold"]
+            return [
+                Score(
+                    "APPROVED" if p >= threshold else "REJECTED",
+                    float(p),
+                    active.version,
+                )
+                for p in probabilities
+            ]
+
+        except Exception as e:
+            logger.exception("❌ Erreur lors de la prédiction batch")
+            raise
+
     def get_model_info(self) -> dict:
         """Retourne les métadonnées du modèle"""
+        active = self._active
         return {
-            "name": self.model_config["name"],
-            "algorithm": self.model_config["algorithm"],
-            "version": self.model_config["version"],
-            "features": self.model_config["features"],
-            "threshold": self.model_config["threshold"],
+            "name": active.config["name"],
+            "algorithm": active.config["algorithm"],
+            "version": active.version,
+            "features": active.config["features"],
+            "threshold": active.config["threshold"],
+            "backend": active.backend,
         }
 
 
 # Singleton global utilisé par FastAPI
 predictor = CreditScoringPredictor()
 
+# Rechargement automatique quand la version active du manifest change
+model_watcher = ManifestWatcher(
+    predictor.registry,
+    on_change=predictor.reload,
+    interval=settings.MODEL_WATCH_INTERVAL_SECONDS,
+    current_version=lambda: predictor.version,
+)
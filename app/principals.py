@@ -0,0 +1,116 @@
+"""
+Cache en mémoire des utilisateurs authentifiés (LRU + TTL), par worker
+
+get_current_user lit ici (id, username, is_active, is_admin) au lieu
+d'interroger la base à chaque requête. Les changements faits par les routes
+d'administration invalident l'entrée du worker qui les traite ; les autres
+workers voient le changement au plus tard après PRINCIPAL_CACHE_TTL_SECONDS
+(la fraîcheur maximale tolérée).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+
+class Principal(NamedTuple):
+    id: int
+    username: str
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.username, bool(user.is_active), bool(user.is_admin))
+
+
+class PrincipalCache:
+    """
+    Cache LRU borné, avec expiration (TTL), clé = sujet du token (username)
+    ou HMAC d'une clé d'API (voir app/api_keys.py, TTL plus court)
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[subject]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return principal
+
+    def put(self, subject: str, principal: Principal, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        with self._lock:
+            self._entries[subject] = (principal, expires_at)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Toutes les entrées d'un utilisateur (token et clés d'API)"""
+        with self._lock:
+            stale = [k for k, (p, _) in self._entries.items() if p.id == user_id]
+            for subject in stale:
+                del self._entries[subject]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            # Chaque hit est une requête SQL évitée
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Singleton global
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
@@ -0,0 +1,117 @@
+"""
+Refresh tokens opaques à rotation, avec détection de réutilisation
+
+Le client reçoit une valeur aléatoire ; la base n'en garde que le SHA-256
+(index unique) : l'échange est une recherche indexée, sans bcrypt (la
+valeur a 256 bits d'entropie, un hachage lent n'apporte rien).
+Chaque refresh consomme le token et en émet un nouveau dans la même
+famille. Présenter un token déjà consommé signifie qu'il a fuité : toute
+la famille est révoquée, le voleur comme le client légitime doivent se
+reconnecter.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import RefreshToken
+
+
+class RefreshTokenError(Exception):
+    """
+    Refresh token inconnu, expiré, révoqué ou réutilisé (401) ; `family_id`
+    désigne la session révoquée lors d'une réutilisation
+    """
+
+    def __init__(self, message: str, family_id: Optional[str] = None):
+        super().__init__(message)
+        self.family_id = family_id
+
+
+class Rotation(NamedTuple):
+    user_id: int
+    family_id: str
+    refresh_token: str
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def new_refresh_token(user_id: int, family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+    """Valeur à renvoyer au client et ligne à insérer"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    return token, RefreshToken(
+        user_id=user_id,
+        token_hash=hash_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        created_at=now,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def revoke_family_stmt(family_id: str):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+def revoke_user_stmt(user_id: int):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+async def issue(db: AsyncSession, user_id: int) -> Tuple[str, str]:
+    """Nouvelle famille (login) → (refresh token, family_id)"""
+    token, row = new_refresh_token(user_id)
+    db.add(row)
+    await db.commit()
+    return token, row.family_id
+
+
+async def rotate(db: AsyncSession, token: str) -> Rotation:
+    """Consomme `token` et émet le suivant de la même famille"""
+    row = (await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_token(token))
+    )).scalars().first()
+    now = datetime.utcnow()
+    if row is None or row.revoked_at is not None or row.expires_at <= now:
+        raise RefreshTokenError("Refresh token invalide ou expiré")
+
+    # UPDATE conditionnel : de deux refresh concurrents, un seul gagne
+    consumed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.used_at.is_(None),
+               RefreshToken.revoked_at.is_(None))
+        .values(used_at=now)
+    )
+    if consumed.rowcount != 1:
+        await db.execute(revoke_family_stmt(row.family_id))
+        await db.commit()
+        raise RefreshTokenError("Refresh token déjà utilisé : session révoquée",
+                                family_id=row.family_id)
+
+    new_token, new_row = new_refresh_token(row.user_id, row.family_id)
+    db.add(new_row)
+    await db.commit()
+    return Rotation(row.user_id, row.family_id, new_token)
+
+
+async def revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(revoke_family_stmt(family_id))
+    await db.commit()
+
+
+async def revoke_user(db: AsyncSession, user_id: int) -> None:
+    await db.execute(revoke_user_stmt(user_id))
+    await db.commit()
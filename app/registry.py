@@ -0,0 +1,160 @@
+"""
+Registre de modèles versionnés : un répertoire d'artefacts et un manifest
+
+Format de `manifest.json` :
+    {
+        "active": "1.1",
+        "versions": {
+            "1.0": {"file": "credit_scoring_model_v1.0.pkl"},
+            "1.1": {"file": "credit_scoring_model_v1.1.pkl", "threshold": 0.55}
+        }
+    }
+
+Chaque entrée peut surcharger les clés de settings.MODEL_CONFIG
+(name, algorithm, threshold...). Les chemins sont relatifs au registre.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+MANIFEST_NAME = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Accès au manifest et aux artefacts du registre"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest_path = self.root / MANIFEST_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def manifest_mtime(self) -> float:
+        return self.manifest_path.stat().st_mtime if self.exists() else 0.0
+
+    def read_manifest(self) -> dict:
+        with open(self.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest.setdefault("versions", {})
+        return manifest
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Écriture atomique : les workers ne lisent jamais un manifest partiel"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def active_version(self) -> str:
+        manifest = self.read_manifest()
+        version = manifest.get("active")
+        if version not in manifest["versions"]:
+            raise KeyError(f"Version active inconnue dans le manifest : {version}")
+        return version
+
+    def entry(self, version: str) -> dict:
+        """Entrée du manifest pour `version`, avec le chemin absolu de l'artefact"""
+        versions = self.read_manifest()["versions"]
+        if version not in versions:
+            raise KeyError(f"Version de modèle inconnue : {version}")
+        entry = dict(versions[version])
+        entry["path"] = (self.root / entry["file"]).resolve()
+        return entry
+
+    def list_versions(self) -> dict:
+        manifest = self.read_manifest()
+        return {"active": manifest.get("active"), "versions": manifest["versions"]}
+
+    def set_active(self, version: str) -> None:
+        manifest = self.read_manifest()
+        if version not in manifest["versions"]:
+            raise KeyError(f"Version de modèle inconnue : {version}")
+        manifest["active"] = version
+        self._write_manifest(manifest)
+
+    def register(
+        self,
+        source: Path,
+        version: str,
+        activate: bool = False,
+        **config
+    ) -> dict:
+        """Copie un artefact dans le registre et l'ajoute au manifest"""
+        manifest = self.read_manifest() if self.exists() else {"versions": {}}
+        if version in manifest["versions"]:
+            raise ValueError(f"Version déjà enregistrée : {version}")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        file_name = f"credit_scoring_model_v{version}{Path(source).suffix}"
+        shutil.copy2(source, self.root / file_name)
+
+        manifest["versions"][version] = dict(
+            config,
+            file=file_name,
+            registered_at=datetime.utcnow().isoformat(),
+        )
+        if activate or not manifest.get("active"):
+            manifest["active"] = version
+        self._write_manifest(manifest)
+        return manifest["versions"][version]
+
+
+class ManifestWatcher:
+    """
+    Surveille le manifest (polling de mtime) dans un thread de fond et
+    appelle `on_change(version_active)` quand la version active change
+
+    `current_version` (optionnel) donne la version réellement chargée : un
+    worker déjà rechargé par ailleurs (route admin) ne recharge pas deux fois.
+    """
+
+    def __init__(self, registry: ModelRegistry, on_change, interval: float,
+                 current_version: Optional[Callable[[], Optional[str]]] = None):
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self.current_version = current_version
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, current_version: Optional[str]) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(current_version,),
+            name="model-manifest-watcher", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self, version: Optional[str]) -> None:
+        last_mtime = self.registry.manifest_mtime()
+        while not self._stop.wait(self.interval):
+            try:
+                mtime = self.registry.manifest_mtime()
+                if mtime == last_mtime or not self.registry.exists():
+                    continue
+                last_mtime = mtime
+                active = self.registry.active_version()
+                if self.current_version is not None:
+                    version = self.current_version()
+                if active != version:
+                    self.on_change(active)
+                    version = active
+            except Exception:
+                logger.exception("❌ Échec du rechargement depuis le manifest")
@@ -0,0 +1,213 @@
+"""
+Routage des lectures vers les réplicas PostgreSQL (DATABASE_REPLICA_URLS)
+
+Les routes en lecture seule dépendent de `get_read_db` / `get_async_read_db` :
+un réplica sain et suffisamment à jour est choisi à tour de rôle, sinon la
+session du primaire est utilisée. Un thread de fond mesure le retard de
+réplication de chaque réplica ; au-delà de REPLICA_MAX_LAG_SECONDS (ou en
+cas d'erreur) le réplica est écarté jusqu'à la mesure suivante.
+
+Sans réplica configuré, les dépendances renvoient simplement la session
+du primaire (get_db / get_async_db).
+"""
+import itertools
+import logging
+import threading
+from typing import List, Optional
+
+from fastapi import Depends
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import get_async_db, get_db, make_async_url
+from app.pool_metrics import PoolMonitor, pool_monitors, pool_options
+
+logger = logging.getLogger(__name__)
+
+# Secondes de retard du réplica ; 0 quand tout le WAL reçu est rejoué
+# (sinon un primaire inactif ferait croire à un retard croissant). NULL si
+# le WAL receiver ne diffuse pas : un réplica coupé du primaire a rejoué tout
+# ce qu'il a reçu mais peut avoir n'importe quel retard. Sans le rôle
+# pg_read_all_stats, status est masqué : la présence du processus suffit.
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver "
+    "                 WHERE COALESCE(status, 'streaming') = 'streaming') THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class Replica:
+    """Moteurs synchrone et asyncio d'un réplica, avec leurs moniteurs de pool"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        sync_monitor = pool_monitors.setdefault(f"{name}-sync", PoolMonitor(f"{name}-sync"))
+        async_monitor = pool_monitors.setdefault(f"{name}-async", PoolMonitor(f"{name}-async"))
+        self.engine = create_engine(url, pool_pre_ping=True, **pool_options(url, sync_monitor))
+        sync_monitor.attach(self.engine)
+        async_url = make_async_url(url)
+        self.async_engine = create_async_engine(
+            async_url, pool_pre_ping=True,
+            **pool_options(async_url, async_monitor, asyncio=True),
+        )
+        async_monitor.attach(self.async_engine.sync_engine)
+        self.sessions = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_sessions = async_sessionmaker(
+            self.async_engine, autoflush=False, expire_on_commit=False
+        )
+
+        # Inconnu tant que la première mesure n'a pas eu lieu : pas de routage
+        self.lag_seconds: Optional[float] = None
+        self.healthy = False
+        self.last_error: Optional[str] = None
+        self.reads = 0
+
+    def check(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = conn.execute(LAG_QUERY).scalar()
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            self._mark_unhealthy(str(e))
+            return
+        if lag is None:
+            # Retard inconnu : écarté tant que la réplication n'a pas repris
+            self.lag_seconds = None
+            self._mark_unhealthy("WAL receiver non connecté au primaire")
+            return
+        self.lag_seconds = float(lag)
+        self.healthy = True
+        self.last_error = None
+
+    def _mark_unhealthy(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("⚠️ Réplica %s indisponible : %s", self.name, reason)
+        self.healthy = False
+        self.last_error = reason
+
+    def get_metrics(self) -> dict:
+        return {
+            "name": self.name,
+            # Sans mot de passe
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "reads": self.reads,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """Choix du réplica (tour de rôle parmi les éligibles) et suivi du retard"""
+
+    def __init__(self, urls: List[str], max_lag_seconds: float, check_interval: float):
+        self.replicas = [Replica(f"replica-{i}", url) for i, url in enumerate(urls)]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    def eligible(self, replica: Replica) -> bool:
+        return (replica.healthy and replica.lag_seconds is not None
+                and replica.lag_seconds <= self.max_lag_seconds)
+
+    def pick(self) -> Optional[Replica]:
+        """Prochain réplica éligible, None → lecture sur le primaire"""
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if self.eligible(replica):
+                    replica.reads += 1
+                    return replica
+            self.primary_reads += 1
+            if self.replicas:
+                self.fallbacks += 1
+        return None
+
+    def check_all(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    def start(self) -> None:
+        if not self.replicas or self._thread is not None:
+            return
+        self.check_all()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-lag-monitor",
+                                        daemon=True)
+        self._thread.start()
+        logger.info("✅ Lectures routées vers %d réplica(s)", len(self.replicas))
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_interval + 5)
+            self._thread = None
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.check_all()
+
+    def get_metrics(self) -> dict:
+        return {
+            "max_lag_seconds": self.max_lag_seconds,
+            "primary_reads": self.primary_reads,
+            # Lectures renvoyées au primaire faute de réplica éligible
+            "fallbacks": self.fallbacks,
+            "replicas": [replica.get_metrics() for replica in self.replicas],
+        }
+
+
+# Singleton global, démarré au startup (sans effet si aucun réplica)
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+
+# ==================== Dépendances ====================
+# La session du primaire n'ouvre de connexion qu'à la première requête :
+# la demander par défaut ne coûte rien quand un réplica est choisi
+
+def get_read_db(primary: Session = Depends(get_db)):
+    """Session synchrone pour une route en lecture seule"""
+    replica = replica_router.pick()
+    if replica is None:
+        yield primary
+        return
+    db = replica.sessions()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(primary: AsyncSession = Depends(get_async_db)):
+    """Session asyncio pour une route en lecture seule"""
+    replica = replica_router.pick()
+    if replica is None:
+        yield primary
+        return
+    async with replica.async_sessions() as db:
+        yield db
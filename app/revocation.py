@@ -0,0 +1,241 @@
+"""
+Révocation des access tokens JWT avant leur expiration
+
+Les identifiants révoqués (jti d'un token, ou identifiant de session "fam"
+pour tous les tokens d'une session) sont enregistrés dans revoked_tokens.
+Chaque worker garde un filtre de Bloom de ces identifiants, reconstruit
+toutes les REVOCATION_REFRESH_INTERVAL_SECONDS : le cas courant (token non
+révoqué) coûte un test en mémoire ; seuls les positifs, vrais ou faux,
+sont confirmés par une lecture en base.
+
+Une révocation est immédiate sur le worker qui la traite, vue par les
+autres au plus tard au rafraîchissement suivant.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.counters import dialect_insert
+from app.database import RefreshToken, RevokedToken, engine
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie des access tokens émis par /auth/login et /auth/refresh :
+# au-delà, une révocation de session n'a plus rien à bloquer
+ACCESS_TOKEN_LIFETIME = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+# Purge des révocations expirées, au plus une fois par intervalle
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class BloomFilter:
+    """Filtre de Bloom (double hachage sur un BLAKE2b de 16 octets)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+def revoke_stmt(dialect: str, token_ids: Iterable[str], expires_at: datetime):
+    """INSERT idempotent (ON CONFLICT DO NOTHING) de révocations"""
+    now = datetime.utcnow()
+    return dialect_insert(dialect, RevokedToken).values([
+        {"token_id": token_id, "revoked_at": now, "expires_at": expires_at}
+        for token_id in token_ids
+    ]).on_conflict_do_nothing(index_elements=["token_id"])
+
+
+def session_expiry() -> datetime:
+    return datetime.utcnow() + ACCESS_TOKEN_LIFETIME
+
+
+def live_families_query(user_id: int):
+    """Sessions de l'utilisateur ayant pu émettre un access token encore valide"""
+    return (
+        select(RefreshToken.family_id).distinct()
+        .where(RefreshToken.user_id == user_id,
+               RefreshToken.created_at >= datetime.utcnow() - ACCESS_TOKEN_LIFETIME)
+    )
+
+
+class RevocationList:
+    """Filtre de Bloom des identifiants révoqués, rafraîchi en arrière-plan"""
+
+    def __init__(self, bind, refresh_interval: float, error_rate: float):
+        self.bind = bind
+        self.refresh_interval = refresh_interval
+        self.error_rate = error_rate
+        self._filter = BloomFilter(1024, error_rate)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge: Optional[float] = None
+        # Ajouts locaux faits pendant une reconstruction, rejoués avant l'échange
+        self._added_during_rebuild: Optional[List[str]] = None
+        self.refreshed_at: Optional[datetime] = None
+
+        self.checks = 0
+        self.filter_hits = 0
+        self.confirmed = 0
+        self.refresh_errors = 0
+
+    def add(self, token_ids: Iterable[str]) -> None:
+        """Effet immédiat sur ce worker, sans attendre le rafraîchissement"""
+        with self._lock:
+            for token_id in token_ids:
+                self._filter.add(token_id)
+                if self._added_during_rebuild is not None:
+                    self._added_during_rebuild.append(token_id)
+
+    def refresh(self, bind=None) -> int:
+        """Reconstruit le filtre depuis les révocations non expirées"""
+        bind = bind if bind is not None else self.bind
+        now = datetime.utcnow()
+        # Avant le SELECT : une révocation locale qui lui échappe est retenue ici
+        with self._lock:
+            self._added_during_rebuild = []
+        try:
+            token_ids = self._load(bind, now)
+        except Exception:
+            with self._lock:
+                self._added_during_rebuild = None
+            raise
+        # Marge ×2 : les révocations locales s'ajoutent d'ici le prochain cycle
+        rebuilt = BloomFilter(max(1024, 2 * len(token_ids)), self.error_rate)
+        for token_id in token_ids:
+            rebuilt.add(token_id)
+        with self._lock:
+            for token_id in self._added_during_rebuild:
+                rebuilt.add(token_id)
+            self._added_during_rebuild = None
+            self._filter = rebuilt
+        self.refreshed_at = now
+        return len(token_ids)
+
+    def _load(self, bind, now: datetime) -> List[str]:
+        """Identifiants révoqués non expirés (et purge périodique des autres)"""
+        with bind.begin() as conn:
+            if (self._last_purge is None
+                    or time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS):
+                conn.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+                self._last_purge = time.monotonic()
+            return conn.execute(
+                select(RevokedToken.token_id).where(RevokedToken.expires_at >= now)
+            ).scalars().all()
+
+    async def is_revoked(self, db: AsyncSession, token_ids: List[str]) -> bool:
+        self.checks += 1
+        with self._lock:
+            candidates = [t for t in token_ids if t and t in self._filter]
+        if not candidates:
+            return False
+        self.filter_hits += 1
+        revoked = (await db.execute(
+            select(RevokedToken.token_id)
+            .where(RevokedToken.token_id.in_(candidates),
+                   RevokedToken.expires_at >= datetime.utcnow())
+            .limit(1)
+        )).first() is not None
+        if revoked:
+            self.confirmed += 1
+        return revoked
+
+    def _refresh_logged(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            self.refresh_errors += 1
+            logger.exception("❌ Rafraîchissement des révocations impossible")
+
+    def start(self) -> None:
+        if self._thread is not None or self.refresh_interval <= 0:
+            return
+        self._refresh_logged()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="revocation-refresher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self._refresh_logged()
+
+    def get_metrics(self) -> dict:
+        false_positives = self.filter_hits - self.confirmed
+        return {
+            "entries": self._filter.count,
+            "filter_bits": self._filter.size,
+            "hash_functions": self._filter.hashes,
+            "refresh_interval_seconds": self.refresh_interval,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "refresh_errors": self.refresh_errors,
+            "checks": self.checks,
+            # Lectures en base : seuls les positifs du filtre en déclenchent
+            "db_lookups": self.filter_hits,
+            "revoked": self.confirmed,
+            "false_positives": false_positives,
+        }
+
+
+# ==================== Révocations ====================
+
+async def revoke(db: AsyncSession, token_ids: List[str], expires_at: datetime) -> None:
+    if not token_ids:
+        return
+    await db.execute(revoke_stmt(db.get_bind().dialect.name, token_ids, expires_at))
+    await db.commit()
+    revocation_list.add(token_ids)
+
+
+def revoke_sync(db, token_ids: List[str], expires_at: datetime) -> None:
+    """Variante session synchrone (routes admin)"""
+    if not token_ids:
+        return
+    db.execute(revoke_stmt(db.get_bind().dialect.name, token_ids, expires_at))
+    db.commit()
+    revocation_list.add(token_ids)
+
+
+def revoke_user_sessions(db, user_id: int) -> List[str]:
+    """Révoque les access tokens de toutes les sessions récentes d'un utilisateur"""
+    families = db.execute(live_families_query(user_id)).scalars().all()
+    revoke_sync(db, families, session_expiry())
+    return families
+
+
+# Singleton global, démarré au startup
+revocation_list = RevocationList(
+    engine,
+    refresh_interval=settings.REVOCATION_REFRESH_INTERVAL_SECONDS,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
@@ -1,24 +1,302 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app import api_keys, revocation
+from app.auth import decode_access_token
+from app.batching import batcher
+from app.cache import prediction_cache
+from app.config import settings
+from app.database import User, get_db
+from app.executor import inference_executor
 from app.dependencies import get_current_admin_user
-from app.crud import get_all_users, get_global_stats
-from app.schemas import UserResponse
+from app.crud import get_users_page, update_user_flags, users_query
+from app.export import iter_csv, iter_parquet, parquet_available, predictions_export_query
+from app.global_stats import global_stats_snapshot
+from app.hashing import password_hasher
+from app.pagination import InvalidCursor, decode_id_cursor, encode_id_cursor
+from app.pool_metrics import pool_monitors
+from app.refresh_tokens import revoke_user_stmt
+from app.replicas import get_read_db, replica_router
+from app.predictor import predictor
+from app.principals import principal_cache
+from app.schemas import (
+    ApiKeyCreate,
+    ApiKeyCreated,
+    ApiKeyResponse,
+    ModelReloadRequest,
+    TokenRevokeRequest,
+    UserAdminUpdate,
+    UserResponse,
+)
+from app.shadow import shadow_scorer
+from app.write_behind import prediction_writer
 
 router = APIRouter(tags=["admin"])
 
+# Lignes lues par aller-retour sur le curseur serveur de /users/stream
+STREAM_CHUNK_SIZE = 1000
+
+def user_filters(
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> dict:
+    """Filtres communs à /users et /users/stream (created_to exclu)"""
+    return dict(is_active=is_active, is_admin=is_admin,
+                created_from=created_from, created_to=created_to)
+
 @router.get("/users", response_model=list[UserResponse])
 def list_users(
+    response: Response,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(user_filters),
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin_user),
+):
+    """Page d'utilisateurs triés par id ; page suivante via l'en-tête X-Next-Cursor"""
+    limit = min(limit, settings.ADMIN_USERS_MAX_PAGE_SIZE)
+    try:
+        after_id = decode_id_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    users = get_users_page(db, limit, after_id=after_id, **filters)
+    if len(users) == limit:
+        response.headers["X-Next-Cursor"] = encode_id_cursor(users[-1].id)
+    return users
+
+@router.get("/users/stream")
+def stream_users(
+    filters: dict = Depends(user_filters),
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin_user),
+):
+    """
+    Tous les utilisateurs filtrés en NDJSON (un objet par ligne), lus par
+    blocs depuis un curseur côté serveur : mémoire constante
+    """
+    query = users_query(**filters).with_only_columns(
+        *(User.__table__.c[field] for field in UserResponse.model_fields)
+    )
+    bind = db.get_bind()
+
+    def lines():
+        # Connexion dédiée : le flux survit à la session de la requête
+        with bind.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, yield_per=STREAM_CHUNK_SIZE
+            ).execute(query)
+            for row in result.mappings():
+                yield UserResponse.model_validate(dict(row)).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+def update_user(
+    user_id: int,
+    changes: UserAdminUpdate,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+):
+    """Désactive / réactive un compte ou change ses droits admin"""
+    user = update_user_flags(db, user_id, **changes.model_dump(exclude_unset=True))
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if changes.is_active is False:
+        # Plus de refresh possible, ni d'access token de ses sessions
+        db.execute(revoke_user_stmt(user.id))
+        db.commit()
+        revocation.revoke_user_sessions(db, user.id)
+    # Effet immédiat sur ce worker (token et clés d'API) ; les autres après
+    # PRINCIPAL_CACHE_TTL_SECONDS (API_KEY_CACHE_TTL_SECONDS pour les clés)
+    principal_cache.invalidate_user(user.id)
+    return user
+
+@router.post("/users/{user_id}/revoke-tokens", status_code=204)
+def revoke_user_tokens(
+    user_id: int,
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin_user),
 ):
-    return get_all_users(db)
+    """
+    Révoque tous les refresh tokens d'un utilisateur et les access tokens
+    de ses sessions (reconnexion forcée)
+    """
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db.execute(revoke_user_stmt(user_id))
+    db.commit()
+    revocation.revoke_user_sessions(db, user_id)
+
+@router.post("/tokens/revoke", status_code=204)
+def revoke_access_token(
+    body: TokenRevokeRequest,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+):
+    """Révoque un access token précis (compromis) par son jti"""
+    try:
+        payload = decode_access_token(body.token)
+    except HTTPException:
+        raise HTTPException(status_code=400, detail="Token invalide ou déjà expiré")
+    if not payload.get("jti"):
+        raise HTTPException(status_code=400, detail="Token sans jti")
+    revocation.revoke_sync(db, [payload["jti"]], datetime.utcfromtimestamp(payload["exp"]))
+
+@router.post("/users/{user_id}/api-keys", response_model=ApiKeyCreated, status_code=201)
+def create_user_api_key(
+    user_id: int,
+    payload: ApiKeyCreate,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+):
+    """Crée une clé d'API ; la clé complète n'est visible que dans cette réponse"""
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    key, row = api_keys.create_api_key(db, user_id, payload.name)
+    return ApiKeyCreated(key=key, **ApiKeyResponse.model_validate(row).model_dump())
+
+@router.get("/users/{user_id}/api-keys", response_model=list[ApiKeyResponse])
+def list_user_api_keys(
+    user_id: int,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+):
+    return api_keys.list_api_keys(db, user_id)
+
+@router.delete("/api-keys/{key_id}", response_model=ApiKeyResponse)
+def revoke_api_key(
+    key_id: int,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin_user),
+):
+    """Révoque une clé : immédiat sur ce worker, API_KEY_CACHE_TTL_SECONDS ailleurs"""
+    row = api_keys.revoke_api_key(db, key_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="API key not found")
+    principal_cache.invalidate(api_keys.cache_key(row.key_hash))
+    return row
 
 @router.get("/stats")
 def global_stats(
-    db: Session = Depends(get_db),
+    approximate: Optional[bool] = None,
+    db: Session = Depends(get_read_db),
     admin=Depends(get_current_admin_user),
 ):
-    return get_global_stats(db)
+    """
+    Volumes globaux depuis un instantané (stale-while-revalidate) ;
+    `snapshot_age_seconds` et `exact` indiquent sa fraîcheur et sa précision
+    """
+    if approximate is None:
+        approximate = settings.ADMIN_STATS_APPROXIMATE
+    return global_stats_snapshot.get(db.get_bind(), approximate=approximate)
+
+
+@router.get("/export/predictions")
+def export_predictions(
+    format: Literal["csv", "parquet"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    model_version: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin_user),
+):
+    """
+    Export en flux des prédictions filtrées (created_to exclu), lu par blocs
+    sur un curseur côté serveur
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    query = predictions_export_query(created_from=created_from, created_to=created_to,
+                                     user_id=user_id, model_version=model_version)
+    chunks = (iter_parquet if format == "parquet" else iter_csv)(
+        db.get_bind(), query, settings.EXPORT_CHUNK_SIZE
+    )
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "text/csv"
+    return StreamingResponse(chunks, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="predictions.{format}"'
+    })
+
+
+@router.get("/metrics/batching")
+def batching_metrics(admin=Depends(get_current_admin_user)):
+    return batcher.get_metrics()
+
+@router.get("/metrics/cache")
+def cache_metrics(admin=Depends(get_current_admin_user)):
+    return prediction_cache.get_metrics()
 
+@router.get("/metrics/pool")
+def pool_metrics(admin=Depends(get_current_admin_user)):
+    """Saturation des pools de connexions (attente au checkout, débordement)"""
+    return {name: monitor.get_metrics() for name, monitor in pool_monitors.items()}
+
+@router.get("/metrics/replicas")
+def replica_metrics(admin=Depends(get_current_admin_user)):
+    """Retard et santé des réplicas, lectures routées / renvoyées au primaire"""
+    return replica_router.get_metrics()
+
+@router.get("/metrics/write-behind")
+def write_behind_metrics(admin=Depends(get_current_admin_user)):
+    """Retard de vidage du spool et tailles des lots insérés"""
+    return prediction_writer.get_metrics()
+
+@router.get("/metrics/hashing")
+def hashing_metrics(admin=Depends(get_current_admin_user)):
+    """File et latence du pool bcrypt (login / register)"""
+    return password_hasher.get_metrics()
+
+@router.get("/metrics/principals")
+def principal_metrics(admin=Depends(get_current_admin_user)):
+    """Taux de hit du cache des utilisateurs authentifiés (requêtes évitées)"""
+    return principal_cache.get_metrics()
+
+@router.get("/metrics/revocation")
+def revocation_metrics(admin=Depends(get_current_admin_user)):
+    return revocation.revocation_list.get_metrics()
+
+@router.get("/metrics/inference")
+def inference_metrics(admin=Depends(get_current_admin_user)):
+    return inference_executor.get_metrics()
+
+
+@router.get("/model/shadow")
+def shadow_metrics(admin=Depends(get_current_admin_user)):
+    """Taux d'accord et latence des modèles challengers"""
+    return shadow_scorer.get_metrics()
+
+@router.get("/model/versions")
+def model_versions(admin=Depends(get_current_admin_user)):
+    registry = predictor.registry.list_versions() if predictor.registry.exists() else {}
+    return {"loaded": predictor.version, **registry}
+
+@router.post("/model/reload", status_code=202)
+def reload_model(
+    background_tasks: BackgroundTasks,
+    body: ModelReloadRequest = ModelReloadRequest(),
+    admin=Depends(get_current_admin_user),
+):
+    """
+    Charge une version en arrière-plan puis l'active atomiquement ; une fois
+    chargée, elle devient active dans le manifest, que les autres workers suivent
+    """
+    version = body.version
+    if predictor.registry.exists():
+        try:
+            version = version or predictor.registry.active_version()
+            predictor.registry.entry(version)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        background_tasks.add_task(predictor.promote, version)
+    elif version not in (None, predictor.version):
+        raise HTTPException(status_code=404, detail="Registre de modèles absent")
+    else:
+        background_tasks.add_task(predictor.reload, version)
+    return {"status": "reloading", "version": version or predictor.version,
+            "loaded": predictor.version}
@@ -1,26 +1,33 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.database import get_db
-from app import crud, schemas
+from app.database import get_async_db
+from app import async_crud, models, refresh_tokens, revocation, schemas
+from app.principals import Principal
 from app.auth import (
     create_access_token,
-    verify_password,
+    decode_access_token,
     get_current_active_user,
+    get_current_user,
+    oauth2_scheme,
 )
+from app.hashing import password_hasher
+from app.refresh_tokens import RefreshTokenError
 
 router = APIRouter(tags=["auth"])
 
 # ================== REGISTER ==================
 
 @router.post("/register", response_model=schemas.UserResponse)
-def register(
+async def register(
     user: schemas.UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Vérifier si l'utilisateur existe déjà par email
-    existing_user = crud.get_user_by_email(db, user.email)
+    existing_user = await async_crud.get_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,45 +35,112 @@ def register(
         )
     
     # Vérifier si l'utilisateur existe déjà par username
-    existing_user = crud.get_user_by_username(db, user.username)
+    existing_user = await async_crud.get_user_by_username(db, user.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Un utilisateur avec ce nom d'utilisateur existe déjà"
         )
     
-    # Créer l'utilisateur
-    return crud.create_user(db, user)
+    # Créer l'utilisateur (hachage sur le pool bcrypt dédié)
+    return await async_crud.create_user(db, user)
 
 # ================== LOGIN ==================
 
-@router.post("/login", response_model=schemas.Token)
-def login(
+@router.post("/login", response_model=models.TokenWithRefresh)
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = crud.get_user_by_username(db, form_data.username)
+    user = await async_crud.get_user_by_username(db, form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants incorrects",
         )
 
+    # Refresh token : une nouvelle famille (session) par login ; l'access
+    # token porte son identifiant pour que /auth/logout la révoque
+    refresh_token, family_id = await refresh_tokens.issue(db, user.id)
     access_token = create_access_token(
-        data={"sub": user.username}
+        data={"sub": user.username, "fam": family_id}
     )
 
     return {
         "access_token": access_token,
-        "token_type": "bearer"
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+# ================== REFRESH ==================
+
+@router.post("/refresh", response_model=models.TokenWithRefresh)
+@router.post("/refresh-token", response_model=models.TokenWithRefresh, include_in_schema=False)
+async def refresh(
+    body: schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Échange un refresh token contre un nouvel access token et un nouveau
+    refresh token (l'ancien est consommé) : recherche indexée, pas de bcrypt
+    """
+    try:
+        rotation = await refresh_tokens.rotate(db, body.refresh_token)
+    except RefreshTokenError as e:
+        if e.family_id:
+            # Réutilisation : les access tokens déjà émis pour la session tombent aussi
+            await revocation.revoke(db, [e.family_id], revocation.session_expiry())
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    user = await async_crud.get_user_by_id(db, rotation.user_id)
+    if user is None or not user.is_active:
+        await refresh_tokens.revoke_family(db, rotation.family_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Compte désactivé")
+
+    access_token = create_access_token(
+        data={"sub": user.username, "fam": rotation.family_id}
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": rotation.refresh_token,
     }
 
+# ================== LOGOUT ==================
+
+@router.post("/logout")
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Révoque la session courante : ses refresh tokens (tous ceux de
+    l'utilisateur si l'access token ne porte pas de session), l'access token
+    présenté et les autres access tokens encore valides de la session
+    """
+    payload = decode_access_token(token)
+    family_id = payload.get("fam")
+    if family_id:
+        await refresh_tokens.revoke_family(db, family_id)
+        await revocation.revoke(db, [family_id], revocation.session_expiry())
+    else:
+        await refresh_tokens.revoke_user(db, current_user.id)
+    if payload.get("jti"):
+        await revocation.revoke(db, [payload["jti"]], datetime.utcfromtimestamp(payload["exp"]))
+    return {"detail": "Déconnexion réussie"}
+
 # ================== ME ==================
 
 @router.get("/me", response_model=schemas.UserResponse)
-def read_me(
-    current_user = Depends(get_current_active_user)
+async def read_me(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return current_user
+    # Le principal ne porte que l'identité : profil complet lu en base
+    user = await async_crud.get_user_by_id(db, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+    return user
 
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
 
-from app.database import get_db, User
+from app.database import get_async_db, User
+from app.config import settings
 from app.schemas import (
+    BatchCreditResponse,
+    BatchItemResult,
     CreditRequest,
     CreditResponse,
     PredictionHistory,
@@ -11,48 +15,166 @@ from app.schemas import (
 )
 
 from app.auth import get_current_active_user
-from app.crud import create_prediction, get_user_predictions, get_user_prediction_stats
-from app.predictor import predictor
+from app.batching import batcher
+from app.cache import normalize_features, prediction_cache
+from app.executor import inference_executor
+from app.async_crud import create_prediction, create_predictions_bulk, get_user_predictions, get_user_prediction_stats
+from app.pagination import InvalidCursor, decode_cursor, next_cursor
+from app.replicas import get_async_read_db
+from app.predictor import Score, predictor
+from app.shadow import shadow_scorer
+from app.write_behind import prediction_writer
 
 router = APIRouter()
 
+async def _score(request: CreditRequest) -> Score:
+    """Évalue une demande : micro-batching si actif, sinon pool d'inférence"""
+    if batcher.is_running():
+        return await batcher.submit(
+            age=request.age, income=request.income,
+            credit_amount=request.credit_amount, duration=request.duration
+        )
+    score, = await inference_executor.predict_batch([
+        (request.age, request.income, request.credit_amount, request.duration)
+    ])
+    return score
+
 @router.post("/predict", response_model=CreditResponse)
 async def predict_credit(request: CreditRequest, http_request: Request,
                          current_user: User = Depends(get_current_active_user),
-                         db: Session = Depends(get_db)):
+                         db: AsyncSession = Depends(get_async_db)):
     if not predictor.is_loaded():
         raise HTTPException(status_code=500, detail="Model not available")
-    decision, probability = predictor.predict(
-        age=request.age, income=request.income,
-        credit_amount=request.credit_amount, duration=request.duration
-    )
-    db_prediction = create_prediction(
-        db=db,
+    if settings.PREDICTION_CACHE_ENABLED:
+        score = await prediction_cache.get_or_compute(
+            normalize_features(request.age, request.income,
+                               request.credit_amount, request.duration),
+            predictor.version,
+            lambda: _score(request),
+        )
+    else:
+        score = await _score(request)
+    prediction = dict(
         user_id=current_user.id,
         age=request.age,
         income=request.income,
         credit_amount=request.credit_amount,
         duration=request.duration,
-        decision=decision,
-        probability=probability,
-        model_version=f"v{predictor.model_config['version']}",
+        decision=score.decision,
+        probability=score.probability,
+        model_version=f"v{score.model_version}",
         ip_address=http_request.client.host if http_request.client else None
     )
+    if prediction_writer.is_running():
+        prediction_id, = await prediction_writer.submit([prediction])
+    else:
+        prediction_id = (await create_prediction(db=db, **prediction)).id
+    shadow_scorer.submit(
+        prediction_id,
+        (request.age, request.income, request.credit_amount, request.duration),
+        score,
+    )
     return CreditResponse(
-        decision=decision,
-        probability=round(probability, 4),
-        model_ver=f"credit_scoring_model_v{predictor.model_config['version']}",
-        prediction_id=db_prediction.id
+        decision=score.decision,
+        probability=round(score.probability, 4),
+        model_ver=f"credit_scoring_model_v{score.model_version}",
+        prediction_id=prediction_id
     )
 
+@router.post("/predict/batch", response_model=BatchCreditResponse)
+async def predict_credit_batch(http_request: Request,
+                               items: List[Any] = Body(...),
+                               current_user: User = Depends(get_current_active_user),
+                               db: AsyncSession = Depends(get_async_db)):
+    if not predictor.is_loaded():
+        raise HTTPException(status_code=500, detail="Model not available")
+    if len(items) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch limité à {settings.BATCH_MAX_SIZE} demandes")
+
+    # Validation ligne par ligne : une ligne invalide n'échoue pas le batch
+    results: List[BatchItemResult] = []
+    valid: List[tuple] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, CreditRequest.model_validate(item)))
+        except ValidationError as e:
+            results.append(BatchItemResult(
+                index=index,
+                errors=e.errors(include_url=False, include_context=False)
+            ))
+
+    scores = await inference_executor.predict_batch([
+        (req.age, req.income, req.credit_amount, req.duration)
+        for _, req in valid
+    ]) if valid else []
+    # Un batch est évalué par un seul modèle : une seule version
+    model_version = scores[0].model_version if scores else predictor.version
+    rows = [
+        dict(req.model_dump(), decision=score.decision, probability=score.probability)
+        for (_, req), score in zip(valid, scores)
+    ]
+    ip_address = http_request.client.host if http_request.client else None
+    if not rows:
+        ids = []
+    elif prediction_writer.is_running():
+        ids = await prediction_writer.submit([
+            dict(row, user_id=current_user.id, model_version=f"v{model_version}",
+                 ip_address=ip_address)
+            for row in rows
+        ])
+    else:
+        ids = await create_predictions_bulk(
+            db=db,
+            user_id=current_user.id,
+            rows=rows,
+            model_version=f"v{model_version}",
+            ip_address=ip_address
+        )
+
+    for (index, req), score, prediction_id in zip(valid, scores, ids):
+        shadow_scorer.submit(
+            prediction_id,
+            (req.age, req.income, req.credit_amount, req.duration),
+            score,
+        )
+    for (index, _), row, prediction_id in zip(valid, rows, ids):
+        results.append(BatchItemResult(index=index, result=CreditResponse(
+            decision=row["decision"],
+            probability=round(row["probability"], 4),
+            model_ver=f"credit_scoring_model_v{model_version}",
+            prediction_id=prediction_id
+        )))
+    results.sort(key=lambda r: r.index)
+
+    return BatchCreditResponse(results=results, succeeded=len(ids),
+                               failed=len(items) - len(ids))
+
 @router.get("/history", response_model=List[PredictionHistory])
-async def get_prediction_history(skip: int = 0, limit: int = 100,
+async def get_prediction_history(response: Response,
+                                 skip: int = Query(0, ge=0),
+                                 limit: int = Query(100, ge=1),
+                                 cursor: Optional[str] = None,
                                  current_user: User = Depends(get_current_active_user),
-                                 db: Session = Depends(get_db)):
-    return get_user_predictions(db, current_user.id, skip=skip, limit=limit)
+                                 db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Historique paginé : `cursor` (valeur de l'en-tête X-Next-Cursor de la page
+    précédente) pour la pagination par clé, sinon `skip`/`limit` (offset)
+    """
+    limit = min(limit, settings.HISTORY_MAX_PAGE_SIZE)
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = await get_user_predictions(db, current_user.id, skip=skip, limit=limit,
+                                      cursor=position)
+    token = next_cursor(rows, limit)
+    if token:
+        response.headers["X-Next-Cursor"] = token
+    return rows
 
 @router.get("/stats", response_model=PredictionStats)
 async def get_prediction_statistics(current_user: User = Depends(get_current_active_user),
-                                    db: Session = Depends(get_db)):
-    return get_user_prediction_stats(db, current_user.id)
+                                    db: AsyncSession = Depends(get_async_read_db)):
+    return await get_user_prediction_stats(db, current_user.id)
 
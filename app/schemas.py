@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from datetime import datetime
 
 # ---------- AUTH ----------
@@ -13,6 +13,10 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 # ---------- CREDIT ----------
 class CreditRequest(BaseModel):
     age: int = Field(..., ge=18, le=100)
@@ -29,6 +33,19 @@ class CreditResponse(BaseModel):
     model_ver: str
     prediction_id: int
 
+
+class BatchItemResult(BaseModel):
+    """Résultat d'une ligne du batch : prédiction ou erreurs de validation"""
+    index: int
+    result: Optional[CreditResponse] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+class BatchCreditResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
 # ================= PREDICTIONS =================
 
     
@@ -50,6 +67,12 @@ class PredictionStats(BaseModel):
     approved: int
     rejected: int
     approval_rate: float
+    last_prediction_at: Optional[datetime] = None
+
+# ---------- MODEL ----------
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = None
+
 
 # ---------- USER ----------
 class UserCreate(BaseModel):
@@ -59,6 +82,35 @@ class UserCreate(BaseModel):
     full_name: Optional[str] = None
 
 
+class UserAdminUpdate(BaseModel):
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class ApiKeyResponse(BaseModel):
+    model_config = {'from_attributes': True}
+
+    id: int
+    user_id: int
+    name: str
+    prefix: str
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+
+class ApiKeyCreated(ApiKeyResponse):
+    # Clé complète, renvoyée une seule fois (seul son HMAC est conservé)
+    key: str
+
+
+class TokenRevokeRequest(BaseModel):
+    token: str
+
+
 class UserResponse(BaseModel):
     model_config = {'from_attributes': True}
     
@@ -1,6 +1,8 @@
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+"""
+Fonctions synchrones de hachage (scripts, crud synchrone) ; les routes async
+passent par app.hashing.password_hasher, qui partage le même contexte
+"""
+from app.hashing import pwd_context
 
 
 def get_password_hash(password: str) -> str:
@@ -9,4 +11,3 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
-
@@ -0,0 +1,188 @@
+"""
+Scoring "shadow" : les modèles challengers évaluent le trafic réel en
+arrière-plan, sans rien ajouter à la latence de /predictions/predict
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.database import SessionLocal, ShadowPrediction
+from app.metrics import Histogram
+from app.predictor import LoadedModel, Score, predictor
+
+logger = logging.getLogger(__name__)
+
+LATENCY_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class ChallengerStats:
+    """Accord avec le champion et latence d'un challenger"""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.scored = 0
+        self.agreed = 0
+        self.abs_diff_sum = 0.0
+        self.batch_latency_ms = Histogram(LATENCY_MS_BUCKETS)
+
+    def snapshot(self) -> dict:
+        return {
+            "version": self.version,
+            "scored": self.scored,
+            "agreement_rate": round(self.agreed / self.scored, 4) if self.scored else None,
+            "mean_abs_probability_diff": (
+                round(self.abs_diff_sum / self.scored, 4) if self.scored else None
+            ),
+            "batch_latency_ms": self.batch_latency_ms.snapshot(),
+        }
+
+
+class ShadowScorer:
+    """
+    File bornée + thread de fond qui évalue les challengers par batchs
+
+    submit() ne bloque jamais : si la file est pleine, la ligne est
+    abandonnée (compteur `dropped`) plutôt que de freiner le chemin principal.
+    """
+
+    def __init__(self, versions: Sequence[str], queue_size: int,
+                 batch_size: int, flush_interval: float):
+        self.versions = list(versions)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max(1, queue_size))
+        self._challengers: List[LoadedModel] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats: Dict[str, ChallengerStats] = {}
+        self.submitted = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running() or not self.versions:
+            return
+        for version in self.versions:
+            try:
+                self._challengers.append(predictor.load_version(version))
+                self.stats[version] = ChallengerStats(version)
+            except Exception:
+                logger.exception("❌ Challenger v%s non chargé", version)
+        if not self._challengers:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+        logger.info("👥 Shadow scoring actif : challengers %s", list(self.stats))
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self._thread = None
+        self._challengers.clear()
+
+    def submit(self, prediction_id: Optional[int], row: Sequence[float],
+               champion: Score) -> None:
+        """Met une ligne en file pour les challengers (O(1), non bloquant)"""
+        if not self.is_running():
+            return
+        try:
+            self._queue.put_nowait((prediction_id, tuple(row), champion))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _next_batch(self) -> List[tuple]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._score(batch)
+                except Exception:
+                    logger.exception("❌ Erreur du shadow scoring")
+
+    def _score(self, batch: List[tuple]) -> None:
+        rows = [row for _, row, _ in batch]
+        records = []
+        for challenger in self._challengers:
+            stats = self.stats[challenger.version]
+            start = time.perf_counter()
+            scores = predictor.predict_batch(rows, loaded=challenger)
+            stats.batch_latency_ms.observe((time.perf_counter() - start) * 1000)
+
+            now = datetime.utcnow()
+            for (prediction_id, _, champion), score in zip(batch, scores):
+                agrees = score.decision == champion.decision
+                stats.scored += 1
+                stats.agreed += agrees
+                stats.abs_diff_sum += abs(score.probability - champion.probability)
+                records.append({
+                    "prediction_id": prediction_id,
+                    "champion_version": champion.model_version,
+                    "challenger_version": challenger.version,
+                    "champion_probability": champion.probability,
+                    "probability": score.probability,
+                    "agrees": agrees,
+                    "created_at": now,
+                })
+        self._write(records)
+
+    def _write(self, records: List[dict]) -> None:
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(ShadowPrediction, records)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.write_errors += 1
+            logger.exception("❌ Écriture des résultats shadow impossible")
+        finally:
+            db.close()
+
+    def get_metrics(self) -> dict:
+        return {
+            "enabled": self.is_running(),
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "challengers": [stats.snapshot() for stats in self.stats.values()],
+        }
+
+
+# Singleton global, démarré au startup si SHADOW_CHALLENGERS est renseigné
+shadow_scorer = ShadowScorer(
+    versions=settings.SHADOW_CHALLENGERS,
+    queue_size=settings.SHADOW_QUEUE_SIZE,
+    batch_size=settings.SHADOW_BATCH_SIZE,
+    flush_interval=settings.SHADOW_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,330 @@
+"""
+Persistance différée (write-behind) des prédictions
+
+Les ids viennent de blocs pré-alloués sur la séquence de `predictions` ;
+chaque ligne est d'abord ajoutée à un spool local (fichiers JSONL en ajout
+seul), puis un thread de fond l'insère en base par lots. Après un crash,
+les segments orphelins du spool sont rejoués au démarrage (insertion
+idempotente : les ids sont déjà attribués).
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, text
+
+from app.config import settings
+from app.counters import bump_counters, dialect_insert
+from app.database import Prediction, engine
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+FLUSH_LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def insert_ignore(bind, rows: List[dict]) -> Set[int]:
+    """
+    INSERT multi-lignes qui ignore les ids déjà présents (rejeu idempotent)
+
+    Returns:
+        les ids réellement insérés
+    """
+    stmt = (
+        dialect_insert(bind.dialect.name, Prediction)
+        .on_conflict_do_nothing()
+        .returning(Prediction.id)
+    )
+    return set(bind.execute(stmt, rows).scalars())
+
+
+class IdAllocator:
+    """
+    Blocs d'ids tirés de la séquence Postgres en une requête
+
+    Hors Postgres (SQLite de dev/test), les ids partent de max(id) : valable
+    pour un seul processus.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = max(1, block_size)
+        self._ids: Deque[int] = deque()
+        self._next_local: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    def _fetch_block(self) -> List[int]:
+        with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return list(conn.execute(
+                    text(
+                        "SELECT nextval(pg_get_serial_sequence('predictions', 'id')) "
+                        "FROM generate_series(1, :n)"
+                    ),
+                    {"n": self.block_size},
+                ).scalars())
+            if self._next_local is None:
+                self._next_local = (
+                    conn.execute(select(func.max(Prediction.id))).scalar() or 0
+                ) + 1
+        start, self._next_local = self._next_local, self._next_local + self.block_size
+        return list(range(start, self._next_local))
+
+    async def allocate(self, n: int) -> List[int]:
+        async with self._lock:
+            while len(self._ids) < n:
+                self._ids.extend(await run_in_threadpool(self._fetch_block))
+            return [self._ids.popleft() for _ in range(n)]
+
+
+class SpoolSegment:
+    """
+    Fichier JSONL en ajout seul, verrouillé (flock) tant qu'il est vivant
+
+    `pending` garde en mémoire les lignes pas encore insérées en base ;
+    le fichier, lui, ne sert qu'au rejeu après un crash.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.pending: List[dict] = []
+        self.written = 0
+
+    def append(self, rows: List[dict], fsync: bool) -> None:
+        self.file.write("".join(json.dumps(row, default=str) + "\n" for row in rows))
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        self.pending.extend(rows)
+        self.written += len(rows)
+
+    def discard(self) -> None:
+        """Supprime le segment une fois ses lignes en base"""
+        self.path.unlink(missing_ok=True)
+        self.file.close()
+
+
+class PredictionWriter:
+    """Spool local + thread de vidage par lots vers la table predictions"""
+
+    def __init__(self, spool_dir: Path, flush_interval: float, max_batch: int,
+                 id_block_size: int, fsync: bool, segment_max_rows: int = 100_000):
+        self.spool_dir = Path(spool_dir)
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.fsync = fsync
+        # Un segment reçoit les lignes de nombreux cycles de vidage ; il n'est
+        # remplacé (puis supprimé une fois vidé) qu'au-delà de cette taille
+        self.segment_max_rows = max(1, segment_max_rows)
+        self.ids = IdAllocator(id_block_size)
+
+        self._lock = threading.Lock()
+        self._segment: Optional[SpoolSegment] = None
+        self._sealed: Deque[SpoolSegment] = deque()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sequence = 0
+
+        self.flushed = 0
+        self.replayed = 0
+        self.flush_failures = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.flush_lag_seconds = Histogram(FLUSH_LAG_BUCKETS)
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.replay_orphans()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+        self._thread.start()
+        logger.info("✅ Write-behind actif (spool : %s)", self.spool_dir)
+
+    def stop(self) -> None:
+        """Vide ce qui reste puis arrête le thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout=30)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def _new_segment(self) -> SpoolSegment:
+        self._sequence += 1
+        name = f"segment-{os.getpid()}-{time.time_ns()}-{self._sequence}.jsonl"
+        return SpoolSegment(self.spool_dir / name)
+
+    def _append(self, rows: List[dict]) -> int:
+        """Ajoute au segment courant (write + fsync éventuel : I/O bloquantes)"""
+        with self._lock:
+            if self._segment is None:
+                self._segment = self._new_segment()
+            self._segment.append(rows, self.fsync)
+            pending = len(self._segment.pending)
+            if self._segment.written >= self.segment_max_rows:
+                self._sealed.append(self._segment)
+                self._segment = None
+        return pending
+
+    async def submit(self, rows: List[dict]) -> List[int]:
+        """
+        Attribue les ids, ajoute les lignes au spool et rend la main ;
+        l'insertion en base se fait plus tard, par lots
+        """
+        ids = await self.ids.allocate(len(rows))
+        now = datetime.utcnow()
+        rows = [
+            dict(row, id=prediction_id, created_at=row.get("created_at") or now)
+            for row, prediction_id in zip(rows, ids)
+        ]
+        # Hors de la boucle d'événements : un disque lent ne bloque que ce thread
+        pending = await run_in_threadpool(self._append, rows)
+        if pending >= self.max_batch:
+            self._wakeup.set()
+        return ids
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+        self._drain()
+        with self._lock:
+            segment, self._segment = self._segment, None
+        if segment is not None:
+            if segment.pending:
+                segment.file.close()  # rejoué au prochain démarrage
+            else:
+                segment.discard()
+
+    def _drain(self) -> None:
+        """
+        Insère les segments remplacés, dans l'ordre, puis les lignes en attente
+        du segment courant ; s'arrête au premier échec
+        """
+        while self._sealed:
+            if not self._flush_pending(self._sealed[0]):
+                break
+            self._sealed.popleft().discard()
+        else:
+            with self._lock:
+                segment = self._segment
+            if segment is None or self._flush_pending(segment):
+                return
+        # Base indisponible : les lignes restent en attente (et sur disque),
+        # nouvel essai au prochain cycle (ou rejeu au prochain démarrage)
+        self._stop.wait(min(self.flush_interval * 4, 5))
+
+    def _flush_pending(self, segment: SpoolSegment) -> bool:
+        with self._lock:
+            rows, segment.pending = segment.pending, []
+        if not rows or self._flush(rows, segment.path.name):
+            return True
+        with self._lock:
+            segment.pending[:0] = rows
+        return False
+
+    def _flush(self, rows: List[dict], source: str) -> bool:
+        rows = [dict(row, created_at=_as_datetime(row["created_at"])) for row in rows]
+        try:
+            with engine.begin() as conn:
+                inserted: Set[int] = set()
+                for start in range(0, len(rows), self.max_batch):
+                    inserted |= insert_ignore(conn, rows[start:start + self.max_batch])
+                    self.batch_sizes.observe(len(rows[start:start + self.max_batch]))
+                # Seules les lignes nouvelles comptent (un rejeu ne double pas)
+                bump_counters(conn, [row for row in rows if row["id"] in inserted])
+        except Exception:
+            self.flush_failures += 1
+            logger.exception("❌ Vidage du spool impossible (%s)", source)
+            return False
+
+        oldest = min(row["created_at"] for row in rows)
+        self.flush_lag_seconds.observe((datetime.utcnow() - oldest).total_seconds())
+        self.flushed += len(rows)
+        return True
+
+    # ------------------------------------------------------------------
+    # Reprise après crash
+    # ------------------------------------------------------------------
+    def replay_orphans(self) -> int:
+        """
+        Rejoue les segments qu'aucun processus vivant ne verrouille
+        (worker arrêté brutalement) puis les supprime
+        """
+        replayed = 0
+        for path in sorted(self.spool_dir.glob("segment-*.jsonl")):
+            try:
+                segment = SpoolSegment(path)
+            except BlockingIOError:
+                continue  # segment d'un worker vivant
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        segment.pending.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning("⚠️ Ligne tronquée ignorée dans %s", path.name)
+            count = len(segment.pending)
+            if self._flush_pending(segment):
+                replayed += count
+                segment.discard()
+            else:
+                segment.file.close()
+        if replayed:
+            logger.info("🔁 %d prédictions rejouées depuis le spool", replayed)
+        self.replayed += replayed
+        return replayed
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            segments = [*self._sealed] + ([self._segment] if self._segment else [])
+            pending_rows = sum(len(seg.pending) for seg in segments)
+            oldest = [seg.pending[0]["created_at"] for seg in segments if seg.pending]
+        lag = (datetime.utcnow() - min(map(_as_datetime, oldest))).total_seconds() if oldest else 0.0
+        return {
+            "enabled": self.is_running(),
+            "pending_rows": pending_rows,
+            "current_lag_seconds": round(lag, 3),
+            "flushed": self.flushed,
+            "replayed": self.replayed,
+            "flush_failures": self.flush_failures,
+            "batch_size": self.batch_sizes.snapshot(),
+            "flush_lag_seconds": self.flush_lag_seconds.snapshot(),
+        }
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+# Singleton global, démarré au startup si PREDICTION_WRITE_MODE=write_behind
+prediction_writer = PredictionWriter(
+    spool_dir=settings.WRITE_BEHIND_SPOOL_DIR,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS,
+    max_batch=settings.WRITE_BEHIND_MAX_BATCH,
+    id_block_size=settings.WRITE_BEHIND_ID_BLOCK_SIZE,
+    fsync=settings.WRITE_BEHIND_FSYNC,
+    segment_max_rows=settings.WRITE_BEHIND_SEGMENT_MAX_ROWS,
+)
@@ -0,0 +1,67 @@
+"""
+Comparaison de latence : predict_proba sklearn vs forêt compilée
+
+Usage :
+    python benchmarks/bench_inference_backends.py [--repeat 200]
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.compiled_forest import CompiledForest
+from app.config import settings
+
+BATCH_SIZES = (1, 10, 1000)
+
+
+def make_rows(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(18, 100, n),
+        rng.uniform(500, 10000, n),
+        rng.uniform(1000, 50000, n),
+        rng.integers(6, 120, n),
+    ]).astype(np.float64)
+
+
+def measure(fn, X, repeat: int) -> np.ndarray:
+    fn(X)  # échauffement
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = time.perf_counter() - start
+    return timings * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    model = joblib.load(settings.MODEL_PATH)
+    compiled = CompiledForest.from_estimator(model)
+
+    print(f"{'batch':>6} | {'backend':>9} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'rows/s':>10}")
+    print("-" * 56)
+    for size in BATCH_SIZES:
+        X = make_rows(size)
+        for name, fn in (("sklearn", model.predict_proba), ("compiled", compiled.predict_proba)):
+            repeat = max(10, args.repeat // (size // 100 + 1))
+            t = measure(fn, X, repeat)
+            print(
+                f"{size:>6} | {name:>9} | {np.percentile(t, 50):>9.3f} | "
+                f"{np.percentile(t, 99):>9.3f} | {size / (t.mean() / 1000):>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Mémoire par worker selon le mode de chargement du modèle (Linux uniquement)
+
+Lance N processus qui chargent le prédicteur simultanément, puis relève
+RSS et PSS (/proc/self/smaps_rollup) avant et après chargement du modèle.
+Le PSS répartit les pages partagées entre les processus qui les mappent :
+avec MODEL_LOAD_MODE=mmap, le coût du modèle par worker baisse avec N.
+
+Usage :
+    python benchmarks/bench_model_memory.py [--workers 1 4 8]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CONFIGS = (
+    ("sklearn / private", {"INFERENCE_BACKEND": "sklearn", "MODEL_LOAD_MODE": "private"}),
+    ("compiled / private", {"INFERENCE_BACKEND": "compiled", "MODEL_LOAD_MODE": "private"}),
+    ("compiled / mmap", {"INFERENCE_BACKEND": "compiled", "MODEL_LOAD_MODE": "mmap"}),
+)
+
+
+def read_memory_kb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def worker(env: dict, loaded, measure, results) -> None:
+    os.environ.update(env)
+    import warnings
+    warnings.simplefilter("ignore")
+    import joblib, numpy, sklearn.ensemble  # noqa: F401,E401
+    from app.compiled_forest import CompiledForest  # noqa: F401
+
+    loaded.wait()
+    before = read_memory_kb()
+    from app.predictor import predictor
+    predictor.predict_batch([(35, 3200.0, 15000.0, 48)] * 100)
+
+    # Toutes les mesures quand tous les workers ont chargé le modèle
+    measure.wait()
+    after = read_memory_kb()
+    results.put({k: (before[k], after[k]) for k in before})
+    measure.wait()
+
+
+def run(env: dict, n_workers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    loaded, measure = ctx.Barrier(n_workers), ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(env, loaded, measure, results))
+        for _ in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    samples = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    def mean(key, i):
+        return sum(s[key][i] for s in samples) / len(samples) / 1024
+
+    return {
+        "rss": mean("Rss", 1),
+        "pss": mean("Pss", 1),
+        "model_rss": mean("Rss", 1) - mean("Rss", 0),
+        "model_pss": mean("Pss", 1) - mean("Pss", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    # Artefact mmap généré une fois, hors mesure
+    os.environ.update(CONFIGS[-1][1])
+    from app.predictor import CreditScoringPredictor
+    CreditScoringPredictor()
+
+    print(f"{'mode':>20} | {'workers':>7} | {'RSS/worker':>10} | {'PSS/worker':>10} | "
+          f"{'modèle RSS':>10} | {'modèle PSS':>10}   (MiB)")
+    print("-" * 86)
+    for name, env in CONFIGS:
+        for n in args.workers:
+            r = run(env, n)
+            print(f"{name:>20} | {n:>7} | {r['rss']:>10.1f} | {r['pss']:>10.1f} | "
+                  f"{r['model_rss']:>10.2f} | {r['model_pss']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
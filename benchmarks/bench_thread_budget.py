@@ -0,0 +1,86 @@
+"""
+Débit et p99 des prédictions unitaires selon le budget de threads par worker
+
+Pour chaque budget (INFERENCE_THREAD_BUDGET) et chaque nombre de workers,
+lance W processus qui enchaînent des prédictions unitaires pendant
+`--duration` secondes, puis agrège débit total et latences.
+
+Usage :
+    python benchmarks/bench_thread_budget.py [--budgets 0 1 2 4] [--workers 1 4 8]
+
+Budget 0 = n_jobs de l'entraînement (-1 : tous les cœurs), BLAS/OpenMP par défaut.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def worker(budget: int, duration: float, start_barrier, results) -> None:
+    os.environ["INFERENCE_THREAD_BUDGET"] = str(budget)
+    os.environ["INFERENCE_BACKEND"] = "sklearn"
+    import warnings
+    warnings.simplefilter("ignore")
+    from app.predictor import predictor
+
+    row = [(35, 3200.0, 15000.0, 48)]
+    predictor.predict_batch(row)  # échauffement
+    start_barrier.wait()
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while True:
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+        predictor.predict_batch(row)
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def run(budget: int, n_workers: int, duration: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(budget, duration, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    latencies = sorted(lat for _ in processes for lat in results.get())
+    for p in processes:
+        p.join()
+
+    return {
+        "throughput": len(latencies) / duration,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"CPU disponibles : {os.cpu_count()}")
+    print(f"{'budget':>6} | {'workers':>7} | {'req/s':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9}")
+    print("-" * 50)
+    for budget in args.budgets:
+        for n in args.workers:
+            r = run(budget, n, args.duration)
+            label = "train" if budget == 0 else str(budget)
+            print(f"{label:>6} | {n:>7} | {r['throughput']:>8.0f} | "
+                  f"{r['p50']:>9.2f} | {r['p99']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Commandes d'administration de l'API Credit Scoring
+
+Usage :
+    python manage.py register-model models/credit_scoring_model.pkl --version 1.1 [--activate]
+    python manage.py activate-model 1.1
+    python manage.py rebuild-counters
+    python manage.py ensure-partitions [--months-ahead 3]
+    python manage.py prune-partitions [--retention-months 12] [--mode detach|drop] [--dry-run]
+"""
+import argparse
+import logging
+
+from app.config import settings
+from app.registry import ModelRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def register_model(args):
+    registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+    config = {"threshold": args.threshold} if args.threshold is not None else {}
+    registry.register(args.path, args.version, activate=args.activate, **config)
+    logger.info(
+        "✅ Modèle v%s enregistré dans %s (actif : %s)",
+        args.version, registry.root, registry.active_version()
+    )
+
+
+def activate_model(args):
+    registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+    registry.set_active(args.version)
+    logger.info("✅ Version active : v%s (les workers la chargeront à chaud)", args.version)
+
+
+def rebuild_counters(args):
+    from app.counters import rebuild_counters as rebuild
+    from app.database import engine
+
+    with engine.begin() as conn:
+        users = rebuild(conn)
+    logger.info("✅ Compteurs de prédictions recalculés (%d utilisateurs)", users)
+
+
+def ensure_partitions(args):
+    from app.database import engine
+    from app.partitions import ensure_future_partitions
+
+    with engine.begin() as conn:
+        created = ensure_future_partitions(conn, args.months_ahead)
+    logger.info("✅ %d partition(s) créée(s)", len(created))
+
+
+def prune_partitions(args):
+    from app.database import engine
+    from app.partitions import apply_retention
+
+    with engine.begin() as conn:
+        expired = apply_retention(conn, args.retention_months, mode=args.mode,
+                                  dry_run=args.dry_run)
+    action = "à traiter" if args.dry_run else ("supprimées" if args.mode == "drop" else "détachées")
+    logger.info("✅ Partitions %s : %s", action, ", ".join(expired) or "aucune")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register-model", help="Ajouter un modèle au registre")
+    register.add_argument("path")
+    register.add_argument("--version", required=True)
+    register.add_argument("--threshold", type=float)
+    register.add_argument("--activate", action="store_true")
+    register.set_defaults(func=register_model)
+
+    activate = commands.add_parser("activate-model", help="Changer la version active")
+    activate.add_argument("version")
+    activate.set_defaults(func=activate_model)
+
+    counters = commands.add_parser("rebuild-counters",
+                                   help="Recalculer user_prediction_counters depuis predictions")
+    counters.set_defaults(func=rebuild_counters)
+
+    ensure = commands.add_parser("ensure-partitions",
+                                 help="Créer les partitions mensuelles à venir")
+    ensure.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    ensure.set_defaults(func=ensure_partitions)
+
+    prune = commands.add_parser("prune-partitions",
+                                help="Détacher / supprimer les partitions expirées")
+    prune.add_argument("--retention-months", type=int,
+                       default=settings.PREDICTION_RETENTION_MONTHS)
+    prune.add_argument("--mode", choices=("detach", "drop"),
+                       default=settings.PARTITION_RETENTION_MODE)
+    prune.add_argument("--dry-run", action="store_true")
+    prune.set_defaults(func=prune_partitions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Fixtures partagées : base SQLite (sync + asyncio) et utilisateur authentifié
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.auth import get_current_active_user
+from app.database import Base, User, get_async_db, get_db
+from app.main import app
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def db_session(db_url):
+    """Session synchrone sur une base SQLite fichier, tables créées à la volée"""
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSession()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_url, db_session):
+    """Sessions asyncio sur la même base que db_session"""
+    engine = create_async_engine(
+        db_url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool
+    )
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        email="batch@example.com",
+        username="batchuser",
+        hashed_password="x",
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_client(db_session, async_session_factory, test_user):
+    """Client de test authentifié, branché sur la base SQLite"""
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_active_user] = lambda: test_user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
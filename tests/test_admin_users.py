@@ -0,0 +1,62 @@
+"""
+Tests de /admin/users (pagination, filtres) et /admin/users/stream (NDJSON)
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.database import User
+from app.dependencies import get_current_admin_user
+from app.main import app
+
+
+@pytest.fixture
+def admin_client(auth_client, db_session, test_user):
+    db_session.add_all([
+        User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x",
+             is_active=i % 2 == 0, is_admin=i == 0, created_at=datetime(2026, 1, i + 1))
+        for i in range(5)
+    ])
+    db_session.commit()
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    return auth_client
+
+
+def test_users_are_paginated_by_cursor(admin_client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = admin_client.get("/admin/users", params=params)
+        assert response.status_code == 200
+        seen += [u["id"] for u in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == sorted(seen) and len(seen) == 6
+
+
+def test_users_filters(admin_client):
+    active = admin_client.get("/admin/users", params={"is_active": False}).json()
+    assert {u["username"] for u in active} == {"user1", "user3"}
+
+    created = admin_client.get("/admin/users", params={
+        "created_from": "2026-01-02T00:00:00", "created_to": "2026-01-04T00:00:00",
+    }).json()
+    assert {u["username"] for u in created} == {"user1", "user2"}
+
+    admins = admin_client.get("/admin/users", params={"is_admin": True}).json()
+    assert [u["username"] for u in admins] == ["user0"]
+
+
+def test_users_stream_ndjson(admin_client):
+    response = admin_client.get("/admin/users/stream", params={"is_active": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [u["username"] for u in users] == ["batchuser", "user0", "user2", "user4"]
+    assert "hashed_password" not in users[0]
+
+
+def test_invalid_users_cursor(admin_client):
+    assert admin_client.get("/admin/users", params={"cursor": "%%%"}).status_code == 400
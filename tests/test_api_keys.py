@@ -0,0 +1,98 @@
+"""
+Tests des clés d'API (X-API-Key) : création, authentification, révocation
+"""
+import pytest
+
+from app import api_keys, auth
+from app.auth import get_current_active_user
+from app.dependencies import get_current_admin_user
+from app.main import app
+from app.principals import Principal, PrincipalCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PrincipalCache(100, 60)
+    monkeypatch.setattr(auth, "principal_cache", cache)
+    monkeypatch.setattr("app.routers.admin.principal_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def admin_client(auth_client, test_user, cache):
+    # Authentification réelle des clés ; routes admin ouvertes
+    app.dependency_overrides.pop(get_current_active_user, None)
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    return auth_client
+
+
+def create_key(client, user_id, name="scorer"):
+    response = client.post(f"/admin/users/{user_id}/api-keys", json={"name": name})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_key_format_and_hash():
+    key, prefix = api_keys.generate_api_key()
+    assert api_keys.parse_prefix(key) == prefix
+    assert api_keys.hash_api_key(key) == api_keys.hash_api_key(key)
+    assert len(api_keys.hash_api_key(key)) == 64
+    assert api_keys.parse_prefix("not-a-key") is None
+    assert api_keys.parse_prefix(f"other_{prefix}_x") is None
+
+
+def test_api_key_authenticates_and_is_cached(admin_client, test_user, cache):
+    created = create_key(admin_client, test_user.id)
+    assert created["key"].startswith(f"csk_{created['prefix']}_")
+
+    headers = {"X-API-Key": created["key"]}
+    for _ in range(2):
+        me = admin_client.get("/auth/me", headers=headers)
+        assert me.status_code == 200
+        assert me.json()["username"] == test_user.username
+    metrics = cache.get_metrics()
+    assert (metrics["misses"], metrics["hits"]) == (1, 1)
+
+
+def test_wrong_secret_and_missing_credentials(admin_client, test_user):
+    created = create_key(admin_client, test_user.id)
+    # Préfixe valide, secret faux
+    forged = created["key"][:-4] + "AAAA"
+    assert admin_client.get("/auth/me", headers={"X-API-Key": forged}).status_code == 401
+    assert admin_client.get("/auth/me", headers={"X-API-Key": "csk_x"}).status_code == 401
+    response = admin_client.get("/auth/me")
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_list_never_returns_the_key(admin_client, test_user):
+    create_key(admin_client, test_user.id, "a")
+    create_key(admin_client, test_user.id, "b")
+    listed = admin_client.get(f"/admin/users/{test_user.id}/api-keys").json()
+    assert [k["name"] for k in listed] == ["a", "b"]
+    assert all("key" not in k for k in listed)
+    assert admin_client.post("/admin/users/9999/api-keys",
+                             json={"name": "x"}).status_code == 404
+
+
+def test_revocation_invalidates_cache(admin_client, test_user, cache):
+    created = create_key(admin_client, test_user.id)
+    headers = {"X-API-Key": created["key"]}
+    assert admin_client.get("/auth/me", headers=headers).status_code == 200
+
+    response = admin_client.delete(f"/admin/api-keys/{created['id']}")
+    assert response.status_code == 200
+    assert response.json()["revoked_at"] is not None
+    assert admin_client.get("/auth/me", headers=headers).status_code == 401
+    assert admin_client.delete("/admin/api-keys/9999").status_code == 404
+
+
+def test_api_key_entries_use_short_ttl(cache):
+    principal = Principal(1, "bot", True, False)
+    cache.put(api_keys.cache_key("h"), principal, ttl=0)
+    assert cache.get(api_keys.cache_key("h")) is None
+
+    cache.put("bot", principal)
+    cache.put(api_keys.cache_key("h2"), principal)
+    cache.invalidate_user(1)
+    assert cache.get("bot") is None and cache.get(api_keys.cache_key("h2")) is None
@@ -0,0 +1,32 @@
+"""
+Tests de la couche asyncio (AsyncSession) via les routes de prédiction
+"""
+import asyncio
+
+from app import async_crud
+
+PAYLOAD = {"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24}
+
+
+def test_predict_then_history_and_stats(auth_client):
+    created = auth_client.post("/predictions/predict", json=PAYLOAD).json()
+    assert created["prediction_id"] is not None
+
+    history = auth_client.get("/predictions/history").json()
+    assert [h["id"] for h in history] == [created["prediction_id"]]
+
+    stats = auth_client.get("/predictions/stats").json()
+    assert stats["total_predictions"] == 1
+    assert stats["approved"] + stats["rejected"] == 1
+
+
+def test_async_crud_user_lookup(async_session_factory, test_user):
+    async def scenario():
+        async with async_session_factory() as db:
+            by_name = await async_crud.get_user_by_username(db, "batchuser")
+            missing = await async_crud.get_user_by_email(db, "nobody@example.com")
+            return by_name, missing
+
+    by_name, missing = asyncio.run(scenario())
+    assert by_name.id == test_user.id
+    assert missing is None
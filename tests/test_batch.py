@@ -0,0 +1,43 @@
+"""
+Tests de l'endpoint de prédiction batch
+"""
+from app.database import Prediction
+from app.predictor import predictor
+
+
+def test_predict_batch_matches_single_predictions():
+    rows = [(45, 5000, 10000, 24), (22, 1200, 40000, 84)]
+    batch = predictor.predict_batch(rows)
+    for row, score in zip(rows, batch):
+        single_decision, single_probability = predictor.predict(*row)
+        assert score.decision == single_decision
+        assert abs(score.probability - single_probability) < 1e-12
+        assert score.model_version == predictor.version
+
+
+def test_batch_endpoint_scores_valid_rows_and_reports_invalid(auth_client, db_session):
+    payload = [
+        {"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24},
+        {"age": 15, "income": 3200, "credit_amount": 15000, "duration": 48},
+        {"age": 22, "income": 1200, "credit_amount": 40000, "duration": 84},
+    ]
+    response = auth_client.post("/predictions/predict/batch", json=payload)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 1
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][1]["errors"][0]["loc"] == ["age"]
+
+    ids = [data["results"][i]["result"]["prediction_id"] for i in (0, 2)]
+    stored = db_session.query(Prediction).order_by(Prediction.id).all()
+    assert [p.id for p in stored] == ids
+
+
+def test_batch_endpoint_rejects_oversized_batch(auth_client, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "BATCH_MAX_SIZE", 2)
+    payload = [{"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24}] * 3
+    response = auth_client.post("/predictions/predict/batch", json=payload)
+    assert response.status_code == 413
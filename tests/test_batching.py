@@ -0,0 +1,53 @@
+"""
+Tests du micro-batching des prédictions
+"""
+import asyncio
+
+from app.batching import MicroBatcher
+from app.predictor import predictor
+
+
+def test_concurrent_submits_are_grouped_and_answered_in_order():
+    calls = []
+
+    async def predict_fn(rows):
+        calls.append(len(rows))
+        return predictor.predict_batch(rows)
+
+    rows = [(20 + i, 2000.0 + 100 * i, 10000.0, 24) for i in range(10)]
+
+    async def scenario():
+        batcher = MicroBatcher(predict_fn, max_wait_us=50_000, max_batch_size=4)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(*row) for row in rows)), batcher
+        finally:
+            await batcher.stop()
+
+    results, batcher = asyncio.run(scenario())
+
+    assert results == predictor.predict_batch(rows)
+    assert calls == [4, 4, 2]
+    metrics = batcher.get_metrics()
+    assert metrics["batch_size"]["count"] == 3
+    assert metrics["queue_delay_us"]["count"] == 10
+
+
+def test_errors_are_propagated_to_every_caller():
+    async def predict_fn(rows):
+        raise ValueError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(predict_fn, max_wait_us=1000, max_batch_size=8)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.submit(30, 3000.0, 10000.0, 24),
+                batcher.submit(40, 4000.0, 10000.0, 24),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,130 @@
+"""
+Tests du cache des prédictions
+"""
+import asyncio
+
+import pytest
+
+from app.cache import PredictionCache, normalize_features
+from app.predictor import Score
+
+FEATURES = normalize_features(45, 5000, 10000.0, 24)
+
+
+def make_compute(calls, version="1.0", delay=0.0):
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return Score("APPROVED", 0.9, version)
+    return compute
+
+
+def test_normalization_merges_equivalent_inputs_only():
+    assert normalize_features(45, 5000, 10000, 24) == normalize_features(45.0, 5000.0, 10000.0, 24)
+    # Pas d'arrondi : des montants distincts ne partagent pas un score
+    assert normalize_features(45, 5000, 10000, 24) != normalize_features(45, 5000.001, 10000, 24)
+
+
+def test_hit_after_miss():
+    cache, calls = PredictionCache(max_size=10, ttl_seconds=60), []
+
+    async def scenario():
+        await cache.get_or_compute(FEATURES, "1.0", make_compute(calls))
+        return await cache.get_or_compute(FEATURES, "1.0", make_compute(calls))
+
+    assert asyncio.run(scenario()).probability == 0.9
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_expiration():
+    cache, calls = PredictionCache(max_size=10, ttl_seconds=0), []
+
+    async def scenario():
+        await cache.get_or_compute(FEATURES, "1.0", make_compute(calls))
+        await cache.get_or_compute(FEATURES, "1.0", make_compute(calls))
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert cache.expirations == 1
+
+
+def test_lru_eviction():
+    cache, calls = PredictionCache(max_size=2, ttl_seconds=60), []
+
+    async def scenario():
+        for age in (30, 40, 30, 50):
+            await cache.get_or_compute(normalize_features(age, 1, 1, 12), "1.0", make_compute(calls))
+
+    asyncio.run(scenario())
+    assert cache.evictions == 1
+    assert cache.get((normalize_features(30, 1, 1, 12), "1.0")) is not None
+    assert cache.get((normalize_features(40, 1, 1, 12), "1.0")) is None
+
+
+def test_model_change_invalidates():
+    cache, calls = PredictionCache(max_size=10, ttl_seconds=60), []
+
+    async def scenario():
+        await cache.get_or_compute(FEATURES, "1.0", make_compute(calls, "1.0"))
+        return await cache.get_or_compute(FEATURES, "2.0", make_compute(calls, "2.0"))
+
+    assert asyncio.run(scenario()).model_version == "2.0"
+    assert len(calls) == 2
+    assert cache.invalidations == 1
+    assert cache.get_metrics()["size"] == 1
+
+
+def test_concurrent_identical_misses_are_coalesced():
+    cache, calls = PredictionCache(max_size=10, ttl_seconds=60), []
+
+    async def scenario():
+        return await asyncio.gather(*(
+            cache.get_or_compute(FEATURES, "1.0", make_compute(calls, delay=0.01))
+            for _ in range(5)
+        ))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert len(set(results)) == 1
+    assert cache.coalesced == 4
+
+
+def test_failures_reach_waiters_and_are_not_cached():
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            cache.get_or_compute(FEATURES, "1.0", failing),
+            cache.get_or_compute(FEATURES, "1.0", failing),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+    assert cache.get_metrics()["size"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    cache, calls = PredictionCache(max_size=10, ttl_seconds=60), []
+
+    async def scenario():
+        leader = asyncio.ensure_future(
+            cache.get_or_compute(FEATURES, "1.0", make_compute(calls, delay=0.02))
+        )
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(
+            cache.get_or_compute(FEATURES, "1.0", make_compute(calls))
+        )
+        await asyncio.sleep(0)
+        leader.cancel()  # client déconnecté
+        return await waiter, leader
+
+    score, leader = asyncio.run(scenario())
+    assert score.probability == 0.9 and leader.cancelled()
+    assert len(calls) == 1
+    # Le calcul a abouti : il est en cache pour les requêtes suivantes
+    assert cache.get((FEATURES, "1.0")) == score
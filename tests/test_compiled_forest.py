@@ -0,0 +1,97 @@
+"""
+Parité de la forêt compilée avec predict_proba de sklearn
+"""
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from app.compiled_forest import CompiledForest
+from app.config import settings
+
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(18, 100, n),
+        rng.uniform(100, 10000, n),
+        rng.uniform(100, 60000, n),
+        rng.integers(6, 120, n),
+    ]).astype(np.float64)
+
+
+@pytest.fixture(scope="module")
+def shipped_model():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(settings.MODEL_PATH)
+
+
+@pytest.mark.parametrize("n_rows", [1, 10, 1000])
+def test_parity_with_shipped_model(shipped_model, n_rows):
+    X = make_rows(n_rows, seed=n_rows)
+    compiled = CompiledForest.from_estimator(shipped_model)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = shipped_model.predict_proba(X)
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_parity_on_thresholds_exactly(shipped_model):
+    """Les valeurs égales aux seuils doivent partir du même côté que sklearn"""
+    compiled = CompiledForest.from_estimator(shipped_model)
+    X = make_rows(200, seed=1)
+    internal = compiled.left != np.arange(len(compiled.left))
+    feats = compiled.feature[internal][:200]
+    X[np.arange(len(feats)), feats] = compiled.threshold[internal][:200]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = shipped_model.predict_proba(X)
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("estimator_cls", [RandomForestClassifier, ExtraTreesClassifier])
+def test_parity_with_unbounded_depth_and_multiclass(estimator_cls):
+    X = make_rows(500, seed=2)
+    y = (X[:, 1] / X[:, 2] * 10).astype(int) % 3
+    model = estimator_cls(n_estimators=15, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_estimator(model)
+    X_test = make_rows(300, seed=3)
+    np.testing.assert_allclose(
+        compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-12
+    )
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+
+def test_non_forest_model_is_rejected():
+    with pytest.raises(TypeError):
+        CompiledForest.from_estimator(object())
+
+
+def test_predictor_compiled_backend(monkeypatch):
+    from app.predictor import CreditScoringPredictor
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "compiled")
+    compiled = CreditScoringPredictor()
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "sklearn")
+    reference = CreditScoringPredictor()
+
+    rows = make_rows(50).tolist()
+    assert compiled.current().backend == "compiled"
+    got, expected = compiled.predict_batch(rows), reference.predict_batch(rows)
+    assert [s.decision for s in got] == [s.decision for s in expected]
+    np.testing.assert_allclose(
+        [s.probability for s in got], [s.probability for s in expected], atol=1e-12
+    )
+
+
+def test_mmap_artifact_roundtrip(shipped_model, tmp_path):
+    compiled = CompiledForest.from_estimator(shipped_model)
+    path = tmp_path / "model.compiled.joblib"
+    compiled.save(path)
+
+    loaded = CompiledForest.load(path, mmap_mode="r")
+    assert isinstance(loaded.value, np.memmap)
+    X = make_rows(100, seed=4)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
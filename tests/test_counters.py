@@ -0,0 +1,56 @@
+"""
+Tests des compteurs de prédictions par utilisateur
+"""
+from app import crud
+from app.counters import rebuild_counters
+from app.database import Prediction, UserPredictionCounter
+
+PAYLOAD = {"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24}
+
+
+def make_rows(decisions):
+    return [dict(age=45, income=5000.0, credit_amount=10000.0, duration=24,
+                 decision=decision, probability=0.5) for decision in decisions]
+
+
+def test_counters_follow_inserts(db_session, test_user):
+    crud.create_predictions_bulk(db_session, test_user.id,
+                                 make_rows(["APPROVED", "APPROVED", "REJECTED"]), "v1.0")
+    crud.create_prediction(db_session, test_user.id, 30, 2000.0, 5000.0, 12,
+                           "REJECTED", 0.2, "v1.0")
+
+    stats = crud.get_user_prediction_stats(db_session, test_user.id)
+    assert stats["total_predictions"] == 4
+    assert (stats["approved"], stats["rejected"]) == (2, 2)
+    assert stats["approval_rate"] == 0.5
+    last = db_session.query(Prediction).order_by(Prediction.id.desc()).first()
+    assert stats["last_prediction_at"] == last.created_at
+
+
+def test_stats_without_predictions(db_session, test_user):
+    stats = crud.get_user_prediction_stats(db_session, test_user.id)
+    assert stats["total_predictions"] == 0
+    assert stats["approval_rate"] == 0.0
+
+
+def test_async_routes_bump_counters(auth_client, db_session, test_user):
+    auth_client.post("/predictions/predict", json=PAYLOAD)
+    auth_client.post("/predictions/predict/batch", json=[PAYLOAD, PAYLOAD])
+
+    stats = auth_client.get("/predictions/stats").json()
+    assert stats["total_predictions"] == 3
+    assert stats["approved"] + stats["rejected"] == 3
+
+
+def test_rebuild_repairs_drift(db_session, test_user):
+    crud.create_predictions_bulk(db_session, test_user.id,
+                                 make_rows(["APPROVED", "REJECTED"]), "v1.0")
+    counter = db_session.get(UserPredictionCounter, test_user.id)
+    counter.total = 99
+    db_session.commit()
+
+    with db_session.get_bind().begin() as conn:
+        assert rebuild_counters(conn) == 1
+    db_session.expire_all()
+    stats = crud.get_user_prediction_stats(db_session, test_user.id)
+    assert (stats["total_predictions"], stats["approved"], stats["rejected"]) == (2, 1, 1)
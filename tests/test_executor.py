@@ -0,0 +1,56 @@
+"""
+Tests de l'exécuteur d'inférence borné
+"""
+import asyncio
+
+import pytest
+
+from app.executor import InferenceExecutor, InferenceOverloaded
+from app.predictor import predictor
+
+ROWS = [(45, 5000.0, 10000.0, 24), (22, 1200.0, 40000.0, 84)]
+
+
+def test_thread_executor_matches_predictor():
+    executor = InferenceExecutor("thread", max_workers=1, max_queue=0)
+    try:
+        assert asyncio.run(executor.predict_batch(ROWS)) == predictor.predict_batch(ROWS)
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_is_rejected_immediately():
+    executor = InferenceExecutor("thread", max_workers=1, max_queue=0)
+
+    async def scenario():
+        return await asyncio.gather(
+            executor.predict_batch(ROWS),
+            executor.predict_batch(ROWS),
+            return_exceptions=True,
+        )
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert first == predictor.predict_batch(ROWS)
+    assert isinstance(second, InferenceOverloaded)
+    assert executor.get_metrics()["rejected"] == 1
+
+
+def test_unknown_executor_kind():
+    with pytest.raises(ValueError):
+        InferenceExecutor("gpu", max_workers=1, max_queue=0)
+
+
+def test_predict_endpoint_sheds_load_with_503(auth_client, monkeypatch):
+    from app.config import settings
+    from app.executor import inference_executor
+    monkeypatch.setattr(settings, "PREDICTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(inference_executor, "_in_flight", 10_000)
+    response = auth_client.post("/predictions/predict", json={
+        "age": 45, "income": 5000, "credit_amount": 10000, "duration": 24
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
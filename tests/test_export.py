@@ -0,0 +1,59 @@
+"""
+Tests de l'export en flux des prédictions (/admin/export/predictions)
+"""
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.database import Prediction
+from app.dependencies import get_current_admin_user
+from app.export import parquet_available
+from app.main import app
+
+
+@pytest.fixture
+def export_client(auth_client, db_session, test_user, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)  # plusieurs blocs
+    db_session.add_all([
+        Prediction(user_id=test_user.id, age=30 + i, income=3000.0, credit_amount=9000.0,
+                   duration=24, decision="APPROVED" if i % 2 else "REJECTED",
+                   probability=0.5, model_version="v1.0" if i < 3 else "v2.0",
+                   created_at=datetime(2026, 1 + i, 1))
+        for i in range(5)
+    ])
+    db_session.commit()
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    return auth_client
+
+
+def test_csv_export_with_filters(export_client):
+    response = export_client.get("/admin/export/predictions", params={
+        "created_from": "2026-02-01T00:00:00", "model_version": "v1.0",
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(int(r["age"]) for r in rows) == [31, 32]
+
+
+def test_csv_export_all_rows(export_client):
+    rows = list(csv.DictReader(io.StringIO(
+        export_client.get("/admin/export/predictions").text
+    )))
+    assert len(rows) == 5
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow non installé")
+def test_parquet_export(export_client):
+    import pyarrow.parquet as pq
+
+    response = export_client.get("/admin/export/predictions", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 5
+    assert sorted(table.column("age").to_pylist()) == [30, 31, 32, 33, 34]
+    # Un groupe de lignes par bloc lu
+    assert pq.ParquetFile(io.BytesIO(response.content)).num_row_groups == 3
@@ -0,0 +1,77 @@
+"""
+Tests de l'instantané des statistiques globales (/admin/stats)
+"""
+import time
+
+from app.database import User
+from app.dependencies import get_current_admin_user
+from app.global_stats import GlobalStatsSnapshot, RelationStats, combine_estimates
+from app.main import app
+from app.routers import admin
+
+
+def add_user(db_session, name):
+    db_session.add(User(email=f"{name}@example.com", username=name, hashed_password="x"))
+    db_session.commit()
+
+
+def test_stale_snapshot_is_served_then_refreshed(db_session, test_user):
+    snapshot = GlobalStatsSnapshot(ttl_seconds=0)
+    bind = db_session.get_bind()
+    first = snapshot.get(bind)
+    assert first["total_users"] == 1 and first["exact"] is True
+
+    add_user(db_session, "late")
+    # Périmé : l'ancien chiffre est servi tout de suite, le calcul part en fond
+    assert snapshot.get(bind)["total_users"] == 1
+    deadline = time.time() + 3
+    while snapshot.refreshes < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert snapshot.get(bind)["total_users"] == 2
+
+
+def test_fresh_snapshot_is_not_recomputed(db_session, test_user):
+    snapshot = GlobalStatsSnapshot(ttl_seconds=60)
+    bind = db_session.get_bind()
+    snapshot.get(bind)
+    add_user(db_session, "ignored")
+    result = snapshot.get(bind)
+    assert result["total_users"] == 1
+    assert snapshot.refreshes == 1
+    assert result["snapshot_age_seconds"] >= 0
+
+
+def test_approximate_falls_back_to_exact_outside_postgresql(db_session, test_user):
+    result = GlobalStatsSnapshot(ttl_seconds=60).get(db_session.get_bind(), approximate=True)
+    assert result["exact"] is True
+    assert result["total_predictions"] == 0
+
+
+def test_admin_stats_endpoint(auth_client, test_user, monkeypatch):
+    monkeypatch.setattr(admin, "global_stats_snapshot", GlobalStatsSnapshot(ttl_seconds=60))
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    body = auth_client.get("/admin/stats", params={"approximate": True}).json()
+    assert body["total_users"] == 1
+    assert {"exact", "snapshot_age_seconds", "refreshed_at"} <= body.keys()
+
+
+def test_combine_estimates_on_partitioned_table():
+    parent_unanalyzed = RelationStats(True, "p", -1)
+    leaves = [
+        RelationStats(False, "r", 1200),  # mois passé
+        RelationStats(False, "r", 300),   # mois courant
+        RelationStats(False, "r", -1),    # DEFAULT, jamais analysée
+        RelationStats(False, "r", -1),    # mois à venir
+    ]
+    # Partitions vides non analysées comptées pour 0, pas de repli sur COUNT(*)
+    assert combine_estimates([parent_unanalyzed, *leaves]) == 1500
+    # Parent analysé : son total, sans l'ajouter à celui des partitions
+    assert combine_estimates([RelationStats(True, "p", 1510), *leaves]) == 1510
+    # Rien d'analysé : pas d'estimation
+    assert combine_estimates([parent_unanalyzed, RelationStats(False, "r", -1)]) is None
+
+
+def test_combine_estimates_on_plain_table():
+    assert combine_estimates([RelationStats(True, "r", 42)]) == 42
+    assert combine_estimates([RelationStats(True, "r", -1)]) is None
+    assert combine_estimates([]) is None
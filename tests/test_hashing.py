@@ -0,0 +1,81 @@
+"""
+Tests du pool de hachage bcrypt dédié (login / register)
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app import hashing
+from app.hashing import HashingOverloaded, PasswordHasher
+from app.routers import auth as auth_router
+
+
+def test_hash_and_verify_are_metered():
+    hasher = PasswordHasher(max_workers=1, max_queue=4)
+
+    async def scenario():
+        hashed = await hasher.hash("s3cret")
+        return await hasher.verify("s3cret", hashed), await hasher.verify("nope", hashed)
+
+    assert asyncio.run(scenario()) == (True, False)
+    metrics = hasher.get_metrics()
+    assert metrics["hash_ms"]["count"] == 3
+    assert metrics["queue_ms"]["count"] == 3
+    assert metrics["in_flight"] == 0
+    hasher.shutdown()
+
+
+def test_full_queue_is_rejected_immediately():
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+
+    async def scenario():
+        return await asyncio.gather(hasher.hash("a"), hasher.hash("b"),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(r, HashingOverloaded) for r in results) == 1
+    assert hasher.rejected == 1
+    hasher.shutdown()
+
+
+def test_cancelled_request_keeps_its_slot_until_bcrypt_finishes(monkeypatch):
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    release = threading.Event()
+    monkeypatch.setattr(hashing.pwd_context, "hash", lambda password: release.wait(2))
+
+    async def scenario():
+        request = asyncio.ensure_future(hasher.hash("a"))
+        await asyncio.sleep(0.01)
+        request.cancel()  # client déconnecté, bcrypt continue dans le pool
+        await asyncio.sleep(0.01)
+        with pytest.raises(HashingOverloaded):
+            await hasher.hash("b")
+        release.set()
+        while hasher.get_metrics()["in_flight"]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert hasher.rejected == 1
+    hasher.shutdown()
+
+
+def test_register_then_login(auth_client):
+    user = {"email": "new@example.com", "username": "newuser", "password": "s3cret"}
+    assert auth_client.post("/auth/register", json=user).status_code == 200
+    assert auth_client.post("/auth/register", json=user).status_code == 400
+
+    response = auth_client.post("/auth/login",
+                                data={"username": "newuser", "password": "s3cret"})
+    assert response.status_code == 200 and response.json()["access_token"]
+    bad = auth_client.post("/auth/login", data={"username": "newuser", "password": "x"})
+    assert bad.status_code == 401
+
+
+def test_login_returns_503_when_hashing_is_saturated(auth_client, monkeypatch):
+    saturated = PasswordHasher(max_workers=1, max_queue=0)
+    saturated._in_flight = 1
+    monkeypatch.setattr(auth_router, "password_hasher", saturated)
+    response = auth_client.post("/auth/login", data={"username": "batchuser", "password": "pw"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,41 @@
+"""
+Tests du pipeline de logging (échantillonnage, format JSON)
+"""
+import json
+import logging
+
+from app.logging_config import JsonFormatter, SamplingFilter
+
+
+def make_record(name, level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, "msg %s", ("x",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_uses_most_specific_prefix(monkeypatch):
+    sampling = SamplingFilter({"app": 1.0, "app.predictor.requests": 0.0})
+    assert sampling.filter(make_record("app.routers.admin"))
+    assert not sampling.filter(make_record("app.predictor.requests"))
+    assert sampling.filter(make_record("app.predictorx"))
+
+
+def test_warnings_are_never_sampled_out():
+    sampling = SamplingFilter({"app.predictor": 0.0})
+    assert sampling.filter(make_record("app.predictor", logging.WARNING))
+
+
+def test_partial_sampling_rate(monkeypatch):
+    sampling = SamplingFilter({"app.predictor": 0.25})
+    monkeypatch.setattr("app.logging_config.random.random", lambda: 0.1)
+    assert sampling.filter(make_record("app.predictor"))
+    monkeypatch.setattr("app.logging_config.random.random", lambda: 0.5)
+    assert not sampling.filter(make_record("app.predictor"))
+
+
+def test_json_formatter_keeps_extra_fields():
+    line = JsonFormatter().format(make_record("app.predictor", decision="APPROVED"))
+    payload = json.loads(line)
+    assert payload["message"] == "msg x"
+    assert payload["logger"] == "app.predictor"
+    assert payload["decision"] == "APPROVED"
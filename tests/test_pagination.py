@@ -0,0 +1,64 @@
+"""
+Tests de la pagination par curseur de /predictions/history
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.database import Prediction
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def history(db_session, test_user):
+    base = datetime(2026, 1, 1)
+    # Deux paires d'horodatages identiques : l'id doit départager
+    stamps = [base, base, base + timedelta(minutes=1), base + timedelta(minutes=1),
+              base + timedelta(minutes=2)]
+    rows = [
+        Prediction(user_id=test_user.id, age=40, income=3000.0, credit_amount=9000.0,
+                   duration=24, decision="APPROVED", probability=0.7,
+                   model_version="v1.0", created_at=stamp)
+        for stamp in stamps
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return sorted(rows, key=lambda p: (p.created_at, p.id), reverse=True)
+
+
+def test_cursor_walks_every_row_once(auth_client, history):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = auth_client.get("/predictions/history", params=params)
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [p.id for p in history]
+
+
+def test_offset_mode_still_available(auth_client, history):
+    response = auth_client.get("/predictions/history", params={"skip": 1, "limit": 2})
+    assert [row["id"] for row in response.json()] == [p.id for p in history[1:3]]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_page_size_is_capped(auth_client, history, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_MAX_PAGE_SIZE", 3)
+    response = auth_client.get("/predictions/history", params={"limit": 1000})
+    assert len(response.json()) == 3
+
+
+def test_invalid_cursor_is_rejected(auth_client):
+    response = auth_client.get("/predictions/history", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip():
+    stamp = datetime(2026, 1, 1, 12, 30, 0, 123456)
+    assert decode_cursor(encode_cursor(stamp, 42)) == (stamp, 42)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("e30")  # {}
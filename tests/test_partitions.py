@@ -0,0 +1,125 @@
+"""
+Tests des utilitaires de partitionnement mensuel de predictions
+
+Les tests d'intégration migrent une base PostgreSQL jetable désignée par
+TEST_POSTGRES_URL (ignorés sinon) ; elle est remise à zéro (downgrade base)
+à la fin.
+"""
+import os
+import subprocess
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+
+from app.database import Prediction, User
+from app.partitions import (
+    DEFAULT_PARTITION,
+    Partition,
+    add_months,
+    apply_retention,
+    ensure_future_partitions,
+    expired_partitions,
+    has_default_partition,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    parse_bound,
+    partition_name,
+)
+
+PG_URL = os.environ.get("TEST_POSTGRES_URL")
+requires_postgres = pytest.mark.skipif(
+    not PG_URL, reason="TEST_POSTGRES_URL non défini (base PostgreSQL jetable)"
+)
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name(date(2026, 3, 1)) == "predictions_y2026m03"
+
+
+def test_parse_bound():
+    bound = "FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')"
+    assert parse_bound(bound) == (date(2026, 10, 1), date(2026, 11, 1))
+    assert parse_bound("DEFAULT") is None
+
+
+def test_expired_partitions_keep_retention_window():
+    partitions = [
+        Partition(partition_name(month), month, add_months(month, 1))
+        for month in (date(2026, m, 1) for m in range(1, 11))
+    ]
+    # Octobre, rétention 3 mois : juillet, août, septembre (et octobre) restent
+    expired = expired_partitions(partitions, 3, today=date(2026, 10, 17))
+    assert [p.name for p in expired] == [
+        "predictions_y2026m01", "predictions_y2026m02", "predictions_y2026m03",
+        "predictions_y2026m04", "predictions_y2026m05", "predictions_y2026m06",
+    ]
+    assert expired_partitions(partitions, 0, today=date(2026, 10, 17)) == []
+
+
+def test_noop_outside_postgresql(db_session):
+    with db_session.get_bind().begin() as conn:
+        assert ensure_future_partitions(conn, 3) == []
+        assert apply_retention(conn, 1, mode="drop") == []
+
+
+def alembic(*args):
+    env = dict(os.environ, DATABASE_URL=PG_URL)
+    subprocess.run([sys.executable, "-m", "alembic", *args], cwd=ROOT, env=env, check=True)
+
+
+@pytest.fixture
+def pg_engine():
+    alembic("upgrade", "head")
+    engine = create_engine(PG_URL)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        alembic("downgrade", "base")
+
+
+@requires_postgres
+def test_migration_creates_monthly_and_default_partitions(pg_engine):
+    this_month = month_start(datetime.utcnow().date())
+    with pg_engine.begin() as conn:
+        assert is_partitioned(conn)
+        assert has_default_partition(conn)
+        starts = {p.start for p in list_partitions(conn)}
+        assert {this_month, add_months(this_month, 3)} <= starts
+
+
+@requires_postgres
+def test_rows_stranded_in_default_move_to_new_partition(pg_engine):
+    # Mois sans partition : ses lignes tombent dans DEFAULT
+    month = add_months(month_start(datetime.utcnow().date()), 12)
+    with pg_engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            email="pg@example.com", username="pg", hashed_password="x"
+        ).returning(User.id)).scalar()
+        conn.execute(insert(Prediction).values(
+            user_id=user_id, age=45, income=5000.0, credit_amount=10000.0, duration=24,
+            decision="APPROVED", probability=0.8, model_version="v1.0",
+            created_at=datetime(month.year, month.month, 15),
+        ))
+
+    with pg_engine.begin() as conn:
+        created = ensure_future_partitions(conn, 12)
+    assert partition_name(month) in created
+
+    with pg_engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT tableoid::regclass::text FROM predictions"
+        )).scalar() == partition_name(month)
+        assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 0
+        assert has_default_partition(conn)
+
+    with pg_engine.begin() as conn:
+        expired = apply_retention(conn, 1, today=add_months(month, 2), dry_run=True)
+    assert partition_name(month) in expired
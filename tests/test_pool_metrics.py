@@ -0,0 +1,56 @@
+"""
+Tests de l'instrumentation du pool de connexions
+"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.pool_metrics import PoolMonitor, instrumented_pool_class
+
+
+@pytest.fixture
+def monitored_engine(db_url):
+    monitor = PoolMonitor("test")
+    engine = create_engine(
+        db_url,
+        poolclass=instrumented_pool_class(monitor, QueuePool),
+        pool_size=1, max_overflow=1, pool_timeout=0.05, pool_pre_ping=True,
+    )
+    monitor.attach(engine)
+    yield engine, monitor
+    engine.dispose()
+
+
+def test_checkouts_and_overflow_are_counted(monitored_engine):
+    engine, monitor = monitored_engine
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        metrics = monitor.get_metrics()
+        assert metrics["in_use"] == 2
+        assert metrics["overflow"] == 1
+
+    metrics = monitor.get_metrics()
+    assert metrics["pool_class"] == "InstrumentedQueuePool"
+    assert metrics["checkouts"] == 2
+    assert metrics["connects"] == 2
+    assert metrics["overflow_connects"] == 1
+    assert metrics["peak_in_use"] == 2
+    assert metrics["checkout_wait_seconds"]["count"] == 2
+
+
+def test_checkout_timeout_is_recorded(monitored_engine):
+    engine, monitor = monitored_engine
+    with engine.connect(), engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert monitor.get_metrics()["timeouts"] == 1
+
+
+def test_monitor_survives_dispose(monitored_engine):
+    engine, monitor = monitored_engine
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert monitor.get_metrics()["checkouts"] == 1
+    assert monitor.get_metrics()["checkout_wait_seconds"]["count"] == 1
@@ -0,0 +1,42 @@
+"""
+Tests du chargement du modèle (budget de threads)
+"""
+from app import predictor as predictor_module
+from app.config import settings
+from app.predictor import CreditScoringPredictor
+
+
+def test_thread_budget_overrides_training_n_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "sklearn")
+    monkeypatch.setattr(settings, "INFERENCE_THREAD_BUDGET", 2)
+    predictor = CreditScoringPredictor()
+    assert predictor.model.n_jobs == 2
+
+
+def test_zero_budget_keeps_training_settings(monkeypatch):
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "sklearn")
+    monkeypatch.setattr(settings, "INFERENCE_THREAD_BUDGET", 0)
+    predictor = CreditScoringPredictor()
+    assert predictor.model.n_jobs == -1
+
+
+def test_blas_limits_are_scoped_to_limit_threads(monkeypatch):
+    calls = []
+
+    class FakeLimits:
+        def __init__(self, limits):
+            calls.append(("limit", limits))
+
+        def restore_original_limits(self):
+            calls.append(("restore", None))
+
+    monkeypatch.setattr(predictor_module, "threadpool_limits", FakeLimits)
+    monkeypatch.setattr(settings, "INFERENCE_THREAD_BUDGET", 1)
+    predictor = CreditScoringPredictor()
+    # Construire un prédicteur ne touche pas aux limites du processus
+    assert calls == []
+
+    predictor.limit_threads()
+    predictor.limit_threads()
+    predictor.restore_threads()
+    assert calls == [("limit", 1), ("restore", None)]
@@ -0,0 +1,85 @@
+"""
+Tests du cache des utilisateurs authentifiés (get_current_user)
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth
+from app.auth import create_access_token
+from app.database import get_async_db, get_db
+from app.dependencies import get_current_admin_user
+from app.main import app
+from app.principals import Principal, PrincipalCache
+from app.routers import admin
+
+PAYLOAD = {"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24}
+
+
+def test_cache_hits_expiry_and_eviction():
+    cache = PrincipalCache(max_size=2, ttl_seconds=0.05)
+    alice = Principal(1, "alice", True, False)
+    cache.put("alice", alice)
+    assert cache.get("alice") == alice
+    assert cache.get("bob") is None
+
+    cache.put("bob", Principal(2, "bob", True, False))
+    cache.put("carol", Principal(3, "carol", True, False))
+    assert cache.get("alice") is None  # évincé (LRU)
+
+    time.sleep(0.06)
+    assert cache.get("bob") is None  # expiré
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["evictions"], metrics["expirations"]) == (1, 1, 1)
+    assert metrics["hit_rate"] == 0.25
+
+
+@pytest.fixture
+def token_client(db_session, async_session_factory, test_user, monkeypatch):
+    """Client authentifié par un vrai JWT (get_current_user non surchargé)"""
+    cache = PrincipalCache(max_size=100, ttl_seconds=60)
+    monkeypatch.setattr(auth, "principal_cache", cache)
+    monkeypatch.setattr(admin, "principal_cache", cache)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': test_user.username})}"
+    try:
+        yield client, cache
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_principal_is_cached_across_requests(token_client):
+    client, cache = token_client
+    for _ in range(3):
+        assert client.post("/predictions/predict", json=PAYLOAD).status_code == 200
+    assert (cache.misses, cache.hits) == (1, 2)
+
+
+def test_deactivation_invalidates_principal(token_client, test_user):
+    client, cache = token_client
+    assert client.get("/predictions/stats").status_code == 200
+
+    response = client.patch(f"/admin/users/{test_user.id}", json={"is_active": False})
+    assert response.status_code == 200 and response.json()["is_active"] is False
+    assert cache.invalidations == 1
+    assert client.get("/predictions/stats").status_code == 403
+
+
+def test_me_returns_full_profile(token_client, test_user):
+    client, _ = token_client
+    body = client.get("/auth/me").json()
+    assert body["email"] == test_user.email
+
+
+def test_update_unknown_user(token_client):
+    client, _ = token_client
+    assert client.patch("/admin/users/9999", json={"is_admin": True}).status_code == 404
@@ -0,0 +1,90 @@
+"""
+Tests du flux refresh token (rotation, réutilisation, révocation)
+"""
+import pytest
+
+from app import auth, revocation
+from app.auth import get_current_active_user
+from app.dependencies import get_current_admin_user
+from app.main import app
+from app.principals import PrincipalCache
+from app.revocation import RevocationList
+from app.security import get_password_hash
+
+
+@pytest.fixture
+def login(auth_client, db_session, test_user, monkeypatch):
+    test_user.hashed_password = get_password_hash("pw")
+    db_session.commit()
+    # Authentification réelle par le token (pas de principal d'un autre test)
+    app.dependency_overrides.pop(get_current_active_user, None)
+    monkeypatch.setattr(auth, "principal_cache", PrincipalCache(100, 60))
+    revocations = RevocationList(db_session.get_bind(), refresh_interval=0, error_rate=0.001)
+    monkeypatch.setattr(revocation, "revocation_list", revocations)
+    monkeypatch.setattr(auth, "revocation_list", revocations)
+
+    def do_login():
+        response = auth_client.post("/auth/login",
+                                    data={"username": test_user.username, "password": "pw"})
+        assert response.status_code == 200
+        return response.json()
+
+    return do_login
+
+
+def test_refresh_rotates_tokens(auth_client, login):
+    tokens = login()
+    assert tokens["refresh_token"]
+
+    response = auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = auth_client.get("/auth/me",
+                         headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+
+    # L'alias historique fonctionne avec le nouveau token
+    again = auth_client.post("/auth/refresh-token",
+                             json={"refresh_token": rotated["refresh_token"]})
+    assert again.status_code == 200
+
+
+def test_reuse_revokes_the_whole_family(auth_client, login):
+    tokens = login()
+    rotated = auth_client.post("/auth/refresh",
+                               json={"refresh_token": tokens["refresh_token"]}).json()
+
+    # Rejeu de l'ancien token : refusé, et le token légitime tombe avec
+    reused = auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    legit = auth_client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert legit.status_code == 401
+    # ... ainsi que les access tokens déjà émis pour la session
+    me = auth_client.get("/auth/me",
+                         headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 401
+
+
+def test_logout_revokes_session_only(auth_client, login):
+    first, second = login(), login()
+    response = auth_client.post("/auth/logout",
+                                headers={"Authorization": f"Bearer {first['access_token']}"})
+    assert response.status_code == 200
+
+    assert auth_client.post("/auth/refresh",
+                            json={"refresh_token": first["refresh_token"]}).status_code == 401
+    assert auth_client.post("/auth/refresh",
+                            json={"refresh_token": second["refresh_token"]}).status_code == 200
+
+
+def test_admin_revocation_and_unknown_token(auth_client, login, test_user):
+    tokens = login()
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    assert auth_client.post(f"/admin/users/{test_user.id}/revoke-tokens").status_code == 204
+    assert auth_client.post("/auth/refresh",
+                            json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert auth_client.post("/auth/refresh",
+                            json={"refresh_token": "unknown"}).status_code == 401
+    assert auth_client.post("/admin/users/9999/revoke-tokens").status_code == 404
@@ -0,0 +1,100 @@
+"""
+Tests du registre de modèles et du rechargement à chaud
+"""
+import time
+
+import pytest
+
+from app.config import settings
+from app.predictor import CreditScoringPredictor
+from app.registry import ManifestWatcher, ModelRegistry
+
+ROW = (45, 5000.0, 10000.0, 24)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    registry = ModelRegistry(tmp_path / "registry")
+    registry.register(settings.MODEL_PATH, "1.0")
+    registry.register(settings.MODEL_PATH, "2.0", threshold=0.99)
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", registry.root)
+    return registry
+
+
+def test_register_keeps_first_version_active(registry):
+    listing = registry.list_versions()
+    assert listing["active"] == "1.0"
+    assert set(listing["versions"]) == {"1.0", "2.0"}
+    assert registry.entry("2.0")["path"].exists()
+
+
+def test_unknown_version_is_rejected(registry):
+    with pytest.raises(KeyError):
+        registry.set_active("9.9")
+
+
+def test_reload_swaps_atomically_and_records_version(registry):
+    predictor = CreditScoringPredictor()
+    assert predictor.version == "1.0"
+    in_flight = predictor.current()
+
+    predictor.reload("2.0")
+
+    assert predictor.version == "2.0"
+    assert predictor.model_config["threshold"] == 0.99
+    # Une prédiction déjà partie garde son modèle et sa version
+    assert in_flight.version == "1.0"
+    assert in_flight.config["threshold"] == 0.5
+
+    score, = predictor.predict_batch([ROW])
+    assert score.model_version == "2.0"
+    assert score.decision == "REJECTED"
+
+
+def test_watcher_follows_active_version(registry):
+    reloaded = []
+    watcher = ManifestWatcher(registry, on_change=reloaded.append, interval=0.02)
+    watcher.start("1.0")
+    try:
+        time.sleep(0.05)
+        registry.set_active("2.0")
+        deadline = time.time() + 2
+        while not reloaded and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+    assert reloaded == ["2.0"]
+
+
+def test_promote_only_activates_a_loadable_version(registry):
+    predictor = CreditScoringPredictor()
+    broken = registry.root / "broken.pkl"
+    broken.write_bytes(b"not a pickle")
+    registry.register(broken, "3.0")
+
+    with pytest.raises(Exception):
+        predictor.promote("3.0")
+    # Ni ce worker ni le manifest (donc les autres workers) ne basculent
+    assert predictor.version == "1.0"
+    assert registry.active_version() == "1.0"
+
+    predictor.promote("2.0")
+    assert predictor.version == "2.0"
+    assert registry.active_version() == "2.0"
+
+
+def test_watcher_skips_version_already_loaded(registry):
+    reloaded = []
+    loaded = {"version": "1.0"}
+    watcher = ManifestWatcher(registry, on_change=reloaded.append, interval=0.02,
+                              current_version=lambda: loaded["version"])
+    watcher.start("1.0")
+    try:
+        time.sleep(0.05)
+        # Ce worker a déjà chargé 2.0 (route admin) avant d'écrire le manifest
+        loaded["version"] = "2.0"
+        registry.set_active("2.0")
+        time.sleep(0.2)
+    finally:
+        watcher.stop()
+    assert reloaded == []
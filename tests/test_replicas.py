@@ -0,0 +1,71 @@
+"""
+Tests du routage des lectures vers les réplicas
+"""
+import pytest
+
+from app import replicas
+from app.replicas import ReplicaRouter
+
+PAYLOAD = {"age": 45, "income": 5000, "credit_amount": 10000, "duration": 24}
+
+
+@pytest.fixture
+def router(db_url, db_session):
+    # Le « réplica » est la même base SQLite : seul le routage est testé
+    router = ReplicaRouter([db_url], max_lag_seconds=1.0, check_interval=60)
+    router.check_all()
+    yield router
+    router.replicas[0].engine.dispose()
+
+
+def test_reads_go_to_eligible_replica(router):
+    replica = router.pick()
+    assert replica is router.replicas[0]
+    assert router.get_metrics()["replicas"][0]["reads"] == 1
+
+
+def test_lagging_or_failed_replica_falls_back_to_primary(router):
+    replica = router.replicas[0]
+    replica.lag_seconds = 30.0
+    assert router.pick() is None
+
+    replica.lag_seconds, replica.healthy = 0.0, False
+    assert router.pick() is None
+    metrics = router.get_metrics()
+    assert (metrics["fallbacks"], metrics["primary_reads"]) == (2, 2)
+
+
+def test_unchecked_replica_is_not_used(db_url):
+    assert ReplicaRouter([db_url], max_lag_seconds=1.0, check_interval=60).pick() is None
+
+
+def test_read_routes_use_replica(auth_client, router, monkeypatch):
+    monkeypatch.setattr(replicas, "replica_router", router)
+    created = auth_client.post("/predictions/predict", json=PAYLOAD).json()
+
+    history = auth_client.get("/predictions/history").json()
+    assert [h["id"] for h in history] == [created["prediction_id"]]
+    assert auth_client.get("/predictions/stats").json()["total_predictions"] == 1
+    assert router.replicas[0].reads == 2
+
+
+def test_replica_with_disconnected_wal_receiver_is_ineligible(router, monkeypatch):
+    class FakeConnection:
+        dialect = type("Dialect", (), {"name": "postgresql"})()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, statement):
+            # LAG_QUERY → NULL : aucun WAL receiver en streaming
+            return type("Result", (), {"scalar": lambda self: None})()
+
+    replica = router.replicas[0]
+    monkeypatch.setattr(replica.engine, "connect", FakeConnection)
+    replica.check()
+    assert not replica.healthy and replica.lag_seconds is None
+    assert "WAL receiver" in replica.last_error
+    assert router.pick() is None
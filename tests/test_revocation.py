@@ -0,0 +1,142 @@
+"""
+Tests de la révocation des access tokens (jti, filtre de Bloom)
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import auth, revocation
+from app.auth import get_current_active_user
+from app.dependencies import get_current_admin_user
+from app.main import app
+from app.principals import PrincipalCache
+from app.revocation import BloomFilter, RevocationList
+from app.security import get_password_hash
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    ids = [f"jti-{i}" for i in range(1000)]
+    for token_id in ids:
+        bloom.add(token_id)
+    assert all(token_id in bloom for token_id in ids)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.fixture
+def revocations(db_session, monkeypatch):
+    """Liste de révocations isolée, rafraîchie depuis la base de test"""
+    revocations = RevocationList(db_session.get_bind(), refresh_interval=0, error_rate=0.001)
+    monkeypatch.setattr(revocation, "revocation_list", revocations)
+    monkeypatch.setattr(auth, "revocation_list", revocations)
+    return revocations
+
+
+@pytest.fixture
+def login(auth_client, db_session, test_user, revocations, monkeypatch):
+    test_user.hashed_password = get_password_hash("pw")
+    db_session.commit()
+    app.dependency_overrides.pop(get_current_active_user, None)
+    monkeypatch.setattr(auth, "principal_cache", PrincipalCache(100, 60))
+
+    def do_login():
+        response = auth_client.post("/auth/login",
+                                    data={"username": test_user.username, "password": "pw"})
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return do_login
+
+
+def test_tokens_carry_a_unique_jti():
+    first = auth.decode_access_token(auth.create_access_token({"sub": "a"}))
+    second = auth.decode_access_token(auth.create_access_token({"sub": "a"}))
+    assert first["jti"] != second["jti"]
+
+
+def test_logout_revokes_access_token(auth_client, login, revocations):
+    headers = login()
+    assert auth_client.get("/auth/me", headers=headers).status_code == 200
+    assert auth_client.post("/auth/logout", headers=headers).status_code == 200
+
+    response = auth_client.get("/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token révoqué"
+    # Une autre session reste valide
+    assert auth_client.get("/auth/me", headers=login()).status_code == 200
+    assert revocations.get_metrics()["revoked"] == 1
+
+
+def test_revocation_from_another_worker_seen_after_refresh(auth_client, login,
+                                                           db_session, revocations):
+    headers = login()
+    jti = auth.decode_access_token(headers["Authorization"].split()[1])["jti"]
+    # Écriture directe en base : ce worker ne la voit qu'au rafraîchissement
+    db_session.execute(revocation.revoke_stmt("sqlite", [jti],
+                                              datetime.utcnow() + timedelta(minutes=5)))
+    db_session.commit()
+    assert auth_client.get("/auth/me", headers=headers).status_code == 200
+
+    assert revocations.refresh() == 1
+    assert auth_client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_admin_revokes_token_and_user_sessions(auth_client, login, test_user):
+    app.dependency_overrides[get_current_admin_user] = lambda: test_user
+    first, second = login(), login()
+
+    response = auth_client.post("/admin/tokens/revoke",
+                                json={"token": first["Authorization"].split()[1]})
+    assert response.status_code == 204
+    assert auth_client.get("/auth/me", headers=first).status_code == 401
+    assert auth_client.get("/auth/me", headers=second).status_code == 200
+
+    assert auth_client.post(f"/admin/users/{test_user.id}/revoke-tokens").status_code == 204
+    assert auth_client.get("/auth/me", headers=second).status_code == 401
+    assert auth_client.post("/admin/tokens/revoke",
+                            json={"token": "garbage"}).status_code == 400
+
+
+def test_false_positive_is_confirmed_in_database(async_session_factory, revocations):
+    revocations.add(["ghost"])  # dans le filtre, absent de la table
+
+    async def check():
+        async with async_session_factory() as db:
+            return await revocations.is_revoked(db, ["ghost", None])
+
+    assert asyncio.run(check()) is False
+    metrics = revocations.get_metrics()
+    assert (metrics["db_lookups"], metrics["false_positives"]) == (1, 1)
+
+
+def test_refresh_purges_expired_entries(db_session, revocations):
+    db_session.execute(revocation.revoke_stmt("sqlite", ["old"],
+                                              datetime.utcnow() - timedelta(minutes=1)))
+    db_session.execute(revocation.revoke_stmt("sqlite", ["live"],
+                                              datetime.utcnow() + timedelta(minutes=1)))
+    db_session.commit()
+    assert revocations.refresh() == 1
+    assert db_session.get(revocation.RevokedToken, "old") is None
+
+
+def test_local_revocation_during_rebuild_survives_the_swap(revocations, monkeypatch):
+    def load_missing_concurrent_add(bind, now):
+        # Révocation locale commitée après le SELECT de la reconstruction
+        revocations.add(["late-jti"])
+        return []
+
+    monkeypatch.setattr(revocations, "_load", load_missing_concurrent_add)
+    revocations.refresh()
+    assert "late-jti" in revocations._filter
+
+
+def test_one_lifetime_for_tokens_and_session_revocations():
+    lifetime = timedelta(minutes=auth.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    assert revocation.ACCESS_TOKEN_LIFETIME == lifetime
+    payload = auth.decode_access_token(auth.create_access_token({"sub": "a"}))
+    token_expiry = datetime.utcfromtimestamp(payload["exp"])
+    # Une révocation de session vit au moins aussi longtemps que ses tokens
+    assert revocation.session_expiry() >= token_expiry
+    assert revocation.session_expiry() - token_expiry < timedelta(seconds=5)
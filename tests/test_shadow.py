@@ -0,0 +1,71 @@
+"""
+Tests du scoring shadow (challengers en arrière-plan)
+"""
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import shadow
+from app.config import settings
+from app.database import ShadowPrediction
+from app.predictor import Score, predictor
+from app.registry import ModelRegistry
+from app.shadow import ShadowScorer
+
+ROWS = [(45, 5000.0, 10000.0, 24), (22, 1200.0, 40000.0, 84)]
+
+
+@pytest.fixture
+def challenger_registry(tmp_path, monkeypatch):
+    registry = ModelRegistry(tmp_path / "registry")
+    registry.register(settings.MODEL_PATH, "1.0")
+    registry.register(settings.MODEL_PATH, "2.0", threshold=0.99)
+    monkeypatch.setattr(predictor, "registry", registry)
+    return registry
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_challengers_are_scored_in_background(challenger_registry, db_session, monkeypatch):
+    monkeypatch.setattr(shadow, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+    scorer = ShadowScorer(["2.0"], queue_size=100, batch_size=10, flush_interval=0.02)
+    scorer.start()
+    try:
+        for i, (row, champion) in enumerate(zip(ROWS, predictor.predict_batch(ROWS))):
+            scorer.submit(i + 1, row, champion)
+        wait_for(lambda: scorer.stats["2.0"].scored == 2)
+    finally:
+        scorer.stop()
+
+    metrics = scorer.get_metrics()
+    challenger, = metrics["challengers"]
+    assert challenger["scored"] == 2
+    # Même modèle, seuil 0.99 : le refus reste d'accord, l'approbation non
+    assert challenger["agreement_rate"] == 0.5
+    stored = db_session.query(ShadowPrediction).order_by(ShadowPrediction.prediction_id).all()
+    assert [(s.prediction_id, s.challenger_version, s.agrees) for s in stored] == [
+        (1, "2.0", False), (2, "2.0", True)
+    ]
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    scorer = ShadowScorer(["2.0"], queue_size=1, batch_size=1, flush_interval=0.02)
+    # Actif mais sans thread : la file n'est jamais consommée
+    monkeypatch.setattr(scorer, "is_running", lambda: True)
+    champion = Score("APPROVED", 0.9, "1.0")
+    for _ in range(3):
+        scorer.submit(None, ROWS[0], champion)
+    assert (scorer.submitted, scorer.dropped) == (1, 2)
+
+
+def test_disabled_without_challengers():
+    scorer = ShadowScorer([], queue_size=10, batch_size=10, flush_interval=0.02)
+    scorer.start()
+    assert not scorer.is_running()
+    scorer.submit(1, ROWS[0], Score("APPROVED", 0.9, "1.0"))
+    assert scorer.submitted == 0
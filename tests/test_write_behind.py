@@ -0,0 +1,102 @@
+"""
+Tests de la persistance différée (spool local + vidage par lots)
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import write_behind
+from app.database import Prediction, UserPredictionCounter
+from app.write_behind import PredictionWriter
+
+
+def make_row(user_id, decision="approved"):
+    return dict(user_id=user_id, age=45, income=5000.0, credit_amount=10000.0,
+                duration=24, decision=decision, probability=0.8,
+                model_version="v1.0", ip_address=None)
+
+
+@pytest.fixture
+def writer(tmp_path, db_session, monkeypatch):
+    monkeypatch.setattr(write_behind, "engine", db_session.get_bind())
+    return PredictionWriter(tmp_path / "spool", flush_interval=0.02, max_batch=100,
+                            id_block_size=10, fsync=False)
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_rows_are_flushed_in_background(writer, db_session, test_user):
+    writer.start()
+    try:
+        ids = asyncio.run(writer.submit([make_row(test_user.id) for _ in range(3)]))
+        wait_for(lambda: writer.flushed == 3)
+    finally:
+        writer.stop()
+
+    assert ids == [1, 2, 3]
+    stored = db_session.query(Prediction).order_by(Prediction.id).all()
+    assert [p.id for p in stored] == ids
+    assert not list(writer.spool_dir.glob("segment-*.jsonl"))
+    metrics = writer.get_metrics()
+    assert metrics["pending_rows"] == 0
+    assert metrics["batch_size"]["count"] >= 1
+
+
+def test_orphan_segments_are_replayed_once(writer, db_session, test_user):
+    writer.spool_dir.mkdir(parents=True)
+    orphan = writer.spool_dir / "segment-1-1-1.jsonl"
+    rows = [dict(make_row(test_user.id), id=i, created_at="2026-01-01T00:00:00")
+            for i in (7, 8)]
+    orphan.write_text("".join(json.dumps(r) + "\n" for r in rows) + '{"tronq')
+
+    assert writer.replay_orphans() == 2
+    assert not orphan.exists()
+
+    # Rejeu d'un segment déjà inséré (crash après commit) : pas de doublon
+    orphan.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    assert writer.replay_orphans() == 2
+    assert db_session.query(Prediction).count() == 2
+    # ... ni double comptage
+    assert db_session.get(UserPredictionCounter, test_user.id).total == 2
+
+
+def test_ids_continue_after_existing_rows(writer, db_session, test_user):
+    db_session.add(Prediction(**dict(make_row(test_user.id), id=41)))
+    db_session.commit()
+    assert asyncio.run(writer.ids.allocate(2)) == [42, 43]
+
+
+def test_segment_is_reused_across_flush_cycles(writer, db_session, test_user):
+    writer.segment_max_rows = 4
+    writer.start()
+    try:
+        asyncio.run(writer.submit([make_row(test_user.id)]))
+        wait_for(lambda: writer.flushed == 1)
+        first = list(writer.spool_dir.glob("segment-*.jsonl"))
+        asyncio.run(writer.submit([make_row(test_user.id)]))
+        wait_for(lambda: writer.flushed == 2)
+        # Même fichier après plusieurs cycles de vidage
+        assert list(writer.spool_dir.glob("segment-*.jsonl")) == first
+
+        # Au-delà de segment_max_rows : remplacé puis supprimé une fois vidé
+        asyncio.run(writer.submit([make_row(test_user.id) for _ in range(2)]))
+        wait_for(lambda: writer.flushed == 4)
+        wait_for(lambda: not list(writer.spool_dir.glob("segment-*.jsonl")))
+        assert not list(writer.spool_dir.glob("segment-*.jsonl"))
+    finally:
+        writer.stop()
+    assert db_session.query(Prediction).count() == 4
+
+
+def test_failed_flush_keeps_rows_pending(writer, test_user, monkeypatch):
+    monkeypatch.setattr(writer, "_flush", lambda rows, source: False)
+    writer.spool_dir.mkdir(parents=True)
+    asyncio.run(writer.submit([make_row(test_user.id) for _ in range(2)]))
+    assert not writer._flush_pending(writer._segment)
+    assert writer.get_metrics()["pending_rows"] == 2